@@ -0,0 +1,56 @@
+"""
+Cold-start benchmark: time from launching the GUI process to its first paint.
+
+    python benchmarks/startup.py [--runs 5]
+
+Each run starts src/main.py with WATERMARK_STARTUP_PROBE=1; the app prints
+the in-process time to first paint and quits. Reported:
+  wall       - process launch to the probe line (includes interpreter start)
+  in-process - main.py import to first paint
+  fitz       - whether PyMuPDF was already imported at first paint
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MAIN = os.path.join(ROOT, 'src', 'main.py')
+
+
+def run_once():
+    env = dict(os.environ, WATERMARK_STARTUP_PROBE='1')
+    start = time.perf_counter()
+    process = subprocess.Popen([sys.executable, MAIN], stdout=subprocess.PIPE,
+                               stderr=subprocess.DEVNULL, text=True, env=env, cwd=ROOT)
+    for line in process.stdout:
+        if line.startswith('first_paint_ms='):
+            wall_ms = (time.perf_counter() - start) * 1000
+            break
+    else:
+        process.wait()
+        raise RuntimeError("the application exited without painting")
+    process.wait(timeout=30)
+
+    fields = dict(part.split('=', 1) for part in line.split())
+    return wall_ms, float(fields['first_paint_ms']), fields['fitz_loaded'] == 'True'
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5)
+    args = parser.parse_args()
+
+    results = [run_once() for _ in range(args.runs)]
+    wall = [r[0] for r in results]
+    in_process = [r[1] for r in results]
+    print(f"runs:       {args.runs}")
+    print(f"wall:       median {statistics.median(wall):.0f} ms, min {min(wall):.0f} ms")
+    print(f"in-process: median {statistics.median(in_process):.0f} ms, min {min(in_process):.0f} ms")
+    print(f"fitz:       {'loaded' if any(r[2] for r in results) else 'deferred'}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,231 @@
+"""
+Headless batch cleaner.
+
+    python -m src.cli [options] INPUT [INPUT ...]
+
+Uses the core modules directly and never imports Qt, so it starts fast and
+runs without a display (servers, cron jobs over nightly drops).
+Exit status: 0 when every file succeeded, 1 when any input or file failed,
+2 on usage errors.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+from functools import partial
+
+from src.core.cleaner import PDFCleaner, SAVE_STRATEGIES, UNCHANGED_OUTPUTS
+from src.core.clean_engine import CleanEngine
+from src.core.detector import scan_job
+from src.core.file_manager import FileManager
+from src.core.page_windows import budget_enforceable
+from src.core.process_pool import create_process_pool, resolve_worker_count
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog='python -m src.cli',
+        description="Remove watermarks, links and annotations from PDF files without the GUI."
+    )
+    parser.add_argument('inputs', nargs='+', metavar='INPUT', help="PDF files or directories")
+    parser.add_argument('-r', '--recursive', action='store_true',
+                        help="also process PDFs in subdirectories of directory inputs")
+    parser.add_argument('-o', '--output-dir',
+                        help="write cleaned files here, mirroring each input directory's layout "
+                             "(default: next to the originals)")
+    parser.add_argument('-j', '--workers', type=int, default=None,
+                        help="worker processes (default: number of CPUs)")
+    parser.add_argument('--jsonl', metavar='FILE',
+                        help="write one JSON result per file to FILE ('-' for stdout)")
+    parser.add_argument('--scan-only', action='store_true',
+                        help="only detect watermarks, do not write any file")
+    parser.add_argument('--scan-mode', choices=('fast', 'full'), default='full',
+                        help="'fast' samples pages of long documents (default: full)")
+
+    options = parser.add_argument_group("cleaning options")
+    options.add_argument('--keep-links', action='store_true', help="do not remove links")
+    options.add_argument('--annotations', action='store_true', help="remove all annotations")
+    options.add_argument('--watermarks', action='store_true', help="remove watermarks (UPDF, etc.)")
+    options.add_argument('--overwrite', action='store_true',
+                         help="overwrite the original files (cannot be undone)")
+    options.add_argument('--unchanged', choices=UNCHANGED_OUTPUTS, default='copy',
+                         help="output for files with nothing to remove: copy the original, "
+                              "hard-link it, or skip writing (default: copy)")
+    options.add_argument('--fsync', action='store_true',
+                         help="with --overwrite, flush each replaced file to disk before moving on")
+    options.add_argument('--save-strategy', choices=SAVE_STRATEGIES, default='auto',
+                         help="how cleaned files are written (default: auto)")
+    options.add_argument('--page-window', type=int, default=0, metavar='PAGES',
+                         help="process pages in windows of this size, freeing memory between them")
+    options.add_argument('--memory-budget', type=int, default=0, metavar='MB',
+                         help="memory each file may use on top of the worker's own; windows shrink "
+                              "to stay within it and a file that cannot is failed (default: unlimited)")
+    options.add_argument('--mmap', action='store_true',
+                         help="memory-map input files instead of reading them into memory "
+                              "(lower peak memory on very large PDFs; inputs must not change meanwhile)")
+    return parser
+
+
+def collect_files(inputs, recursive=False, output_dir=None, overwrite=False):
+    """
+    Resolves the inputs to job dicts {'path', 'output', 'row'}.
+    Returns (files, missing) where missing lists inputs that do not exist.
+    """
+    file_manager = FileManager()
+    cleaner = PDFCleaner()
+    files = []
+    missing = []
+    seen = set()
+    for input_path in inputs:
+        if not os.path.exists(input_path):
+            missing.append(input_path)
+            continue
+        # Outputs keep their place relative to the directory that was given
+        root = input_path if os.path.isdir(input_path) else os.path.dirname(os.path.abspath(input_path))
+        for path, _ in file_manager.iter_pdf_files([input_path], recursive):
+            if path in seen:
+                continue
+            seen.add(path)
+            if overwrite:
+                output = path
+            else:
+                output = cleaner.generate_output_path(path)
+                if output_dir:
+                    relative = os.path.relpath(os.path.dirname(path), os.path.abspath(root))
+                    output = os.path.normpath(os.path.join(output_dir, relative, os.path.basename(output)))
+            files.append({'path': path, 'output': output, 'row': len(files)})
+    return files, missing
+
+
+def describe(result):
+    """One-line summary of a clean or scan result"""
+    if 'error' in result:
+        return result['error'].splitlines()[0] if result['error'] else "Unknown error"
+    if 'removed' not in result:
+        # Scan result
+        found = []
+        if result.get('links'): found.append(f"{result['links']} links")
+        if result.get('text_patterns'): found.append(f"{len(result['text_patterns'])} text patterns")
+        if result.get('images'): found.append(f"{result['images']} recurring images")
+        summary = "Found: " + ", ".join(found) if found else "Clean (No watermarks detected)"
+        if result.get('producer'):
+            summary += f" - created with {result['producer']}"
+        return summary
+    return result['removed']
+
+
+def run_scan(files, args):
+    """Yields (file_data, result) for every file"""
+    workers = resolve_worker_count(args.workers)
+    paths = [f['path'] for f in files]
+    if workers == 1 or len(files) <= 1:
+        results = (scan_job(path, args.scan_mode, use_mmap=args.mmap) for path in paths)
+        yield from zip(files, results)
+        return
+
+    executor = create_process_pool(min(workers, len(files)))
+    try:
+        results = executor.map(partial(scan_job, mode=args.scan_mode, use_mmap=args.mmap), paths, chunksize=4)
+        yield from zip(files, results)
+    finally:
+        executor.shutdown(cancel_futures=True)
+
+
+def run_clean(files, args):
+    """Yields (file_data, result) for every file, in completion order"""
+    options = {
+        'remove_links': not args.keep_links,
+        'remove_annotations': args.annotations,
+        'remove_watermarks': args.watermarks,
+        'overwrite_original': args.overwrite,
+        'save_strategy': args.save_strategy,
+        'fsync': args.fsync,
+        'unchanged_output': args.unchanged,
+        'page_window': args.page_window,
+        'memory_budget_mb': args.memory_budget,
+        'use_mmap': args.mmap
+    }
+    for file_data in files:
+        os.makedirs(os.path.dirname(file_data['output']) or '.', exist_ok=True)
+
+    for file_data, result in CleanEngine(args.workers, options).run(files):
+        if result.get('success'):
+            parts = []
+            if result.get('links_removed', 0) > 0:
+                parts.append(f"{result['links_removed']} links")
+            if result.get('annotations_removed', 0) > 0:
+                parts.append(f"{result['annotations_removed']} annotations")
+            if result.get('watermarks_removed', 0) > 0:
+                parts.append(f"{result['watermarks_removed']} watermarks")
+            result['removed'] = f"Removed: {', '.join(parts)}" if parts else "No changes needed"
+        yield file_data, result
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.overwrite and args.output_dir:
+        parser.error("--overwrite and --output-dir cannot be combined")
+    if args.workers is not None and args.workers < 1:
+        parser.error("--workers must be at least 1")
+    if args.page_window < 0 or args.memory_budget < 0:
+        parser.error("--page-window and --memory-budget cannot be negative")
+    if args.memory_budget and not budget_enforceable():
+        print("Warning: --memory-budget cannot be enforced on this platform (resident memory "
+              "is not measurable); pages are still processed in windows", file=sys.stderr)
+
+    files, missing = collect_files(args.inputs, args.recursive, args.output_dir, args.overwrite)
+    for input_path in missing:
+        print(f"Not found: {input_path}", file=sys.stderr)
+    if not files:
+        print("No PDF files found", file=sys.stderr)
+        return 1 if missing else 0
+
+    # JSON lines go to stdout or a file; the readable lines then move out of the way
+    jsonl = None
+    if args.jsonl == '-':
+        jsonl = sys.stdout
+    elif args.jsonl:
+        jsonl = open(args.jsonl, 'a', encoding='utf-8')
+    human = sys.stderr if jsonl is sys.stdout else sys.stdout
+
+    results = run_scan(files, args) if args.scan_only else run_clean(files, args)
+    failed = 0
+    peak_rss = None
+    try:
+        for file_data, result in results:
+            ok = 'error' not in result and result.get('success', True)
+            if not ok:
+                failed += 1
+            if result.get('peak_rss'):
+                peak_rss = max(peak_rss or 0, result['peak_rss'])
+
+            if jsonl:
+                record = {'path': file_data['path']}
+                if not args.scan_only:
+                    record['output'] = file_data['output']
+                record.update(result)
+                record.pop('removed', None)
+                jsonl.write(json.dumps(record) + '\n')
+                jsonl.flush()
+            print(f"{'OK ' if ok else 'ERR'} {file_data['path']}: {describe(result)}", file=human)
+    except KeyboardInterrupt:
+        print("Interrupted", file=sys.stderr)
+        return 130
+    finally:
+        if jsonl and jsonl is not sys.stdout:
+            jsonl.close()
+
+    action = "Scanned" if args.scan_only else "Cleaned"
+    summary = f"{action} {len(files) - failed}/{len(files)} files, {failed} failed"
+    if peak_rss:
+        summary += f", peak worker memory {peak_rss / (1024 * 1024):.1f} MB"
+    print(summary, file=sys.stderr)
+    return 1 if failed or missing else 0
+
+
+if __name__ == '__main__':
+    # Required for worker processes in frozen builds
+    multiprocessing.freeze_support()
+    sys.exit(main())
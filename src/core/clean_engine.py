@@ -0,0 +1,107 @@
+import threading
+from concurrent.futures import FIRST_COMPLETED, wait
+
+from src.core.cleaner import PDFCleaner
+from src.core.process_pool import create_process_pool, resolve_worker_count
+from src.utils.memory import peak_rss_bytes, reset_peak_rss
+
+
+def clean_job(input_path, output_path, options):
+    """
+    Cleans a single file. Lives at module level so worker processes can unpickle it.
+    The result carries 'peak_rss': the process's peak resident memory in bytes
+    (per job on Linux, since process start elsewhere; None if unknown).
+    """
+    reset_peak_rss()
+    result = PDFCleaner().clean_document(input_path, output_path, options)
+    result['peak_rss'] = peak_rss_bytes()
+    return result
+
+
+class CleanEngine:
+    """
+    Runs PDFCleaner.clean_document jobs on a pool of worker processes.
+    Results are yielded as soon as each job finishes, not in submission order.
+    """
+
+    # Jobs queued per worker; keeps cancellation quick without starving the pool
+    BACKLOG_PER_WORKER = 2
+
+    def __init__(self, max_workers=None, options=None):
+        self.max_workers = resolve_worker_count(max_workers)
+        self.options = options
+        self.cleaner = PDFCleaner()
+        self._cancelled = threading.Event()
+
+    def run(self, files):
+        """
+        files: list of dicts {'path': str, 'row': int, 'output': str (optional)}
+        Yields (file_data, result) tuples in completion order.
+        """
+        jobs = []
+        for file_data in files:
+            output_path = file_data.get('output') or self.cleaner.generate_output_path(file_data['path'])
+            jobs.append((file_data, output_path))
+
+        # A pool costs a process spawn per worker - not worth it for a single job
+        if self.max_workers == 1 or len(jobs) <= 1:
+            yield from self._run_inline(jobs)
+        else:
+            yield from self._run_pool(jobs)
+
+    def cancel(self):
+        """Stops submitting new jobs. Jobs already running are allowed to finish."""
+        self._cancelled.set()
+
+    def is_cancelled(self):
+        return self._cancelled.is_set()
+
+    def _run_inline(self, jobs):
+        for file_data, output_path in jobs:
+            if self._cancelled.is_set():
+                break
+            yield file_data, clean_job(file_data['path'], output_path, self.options)
+
+    def _run_pool(self, jobs):
+        pending = iter(jobs)
+        in_flight = {}
+        backlog = self.max_workers * self.BACKLOG_PER_WORKER
+        executor = create_process_pool(min(self.max_workers, len(jobs)))
+
+        try:
+            while True:
+                # 1. Top up the pool (bounded, so 5,000 files are not all queued at once)
+                while not self._cancelled.is_set() and len(in_flight) < backlog:
+                    job = next(pending, None)
+                    if job is None:
+                        break
+                    file_data, output_path = job
+                    future = executor.submit(clean_job, file_data['path'], output_path, self.options)
+                    in_flight[future] = file_data
+
+                # 2. On cancel, drop everything that has not started yet
+                if self._cancelled.is_set():
+                    for future in list(in_flight):
+                        if future.cancel():
+                            del in_flight[future]
+
+                if not in_flight:
+                    break
+
+                # 3. Stream back whatever finished (timeout keeps cancel responsive)
+                done, _ = wait(in_flight, timeout=0.2, return_when=FIRST_COMPLETED)
+                for future in done:
+                    file_data = in_flight.pop(future)
+                    yield file_data, self._get_result(future)
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _get_result(self, future):
+        try:
+            return future.result()
+        except Exception as e:
+            # Worker crashed or result could not be unpickled
+            return {
+                'success': False,
+                'error': f"Worker process failed: {e}"
+            }
@@ -1,161 +1,163 @@
 import fitz
+import io
 import os
 
+from src.core.content_stream import remove_xobject_calls
+from src.core.document_loader import close_document, open_document
+from src.core.page_windows import PageWindows
+from src.core.resource_inventory import ResourceInventory
+from src.utils.memory import current_rss_bytes
+
+# doc.save() arguments for the rewrite strategies
+# no_new_id keeps the trailer /ID instead of a random one, so the same input and
+# options always give the same bytes (and path and stream mode match)
+SAVE_PROFILES = {
+    # Garbage-collect, recompress and sanitize everything: smallest file, slowest
+    'full': {'garbage': 4, 'deflate': True, 'clean': True, 'no_new_id': True},
+    # Drop unused objects and compress new streams, but leave content streams alone
+    'fast': {'garbage': 1, 'deflate': True, 'no_new_id': True},
+}
+SAVE_STRATEGIES = ('auto', 'full', 'fast', 'incremental')
+# What lands at output_path when nothing had to be removed (nothing is saved):
+# 'copy' the original (a reflink where the file system supports it),
+# 'link' it (hard link - cheapest, but both names then share one file), or 'skip'
+UNCHANGED_OUTPUTS = ('copy', 'link', 'skip')
+
 class PDFCleaner:
+    # An image counts as a logo only when its whole placement fits in this
+    # top-left square (pt), so full-page scans and backgrounds are never touched
+    LOGO_CORNER = 150
+    
     def clean_document(self, input_path, output_path, options=None):
         """
         Removes watermarks/annotations based on options.
         Supports: links, annotations (highlights, stamps, etc.), watermarks (XObjects, images)
         """
+        doc, copy_path = None, None
         try:
-            doc = fitz.open(input_path)
-            
-            remove_links = options.get('remove_links', True) if options else True
-            remove_annotations = options.get('remove_annotations', False) if options else False
-            remove_watermarks = options.get('remove_watermarks', False) if options else False
+            baseline = current_rss_bytes()
+            remove_links, remove_annotations, remove_watermarks, save_strategy = self._read_options(options)
             overwrite_original = options.get('overwrite_original', False) if options else False
+            if not overwrite_original:
+                _check_output_path(input_path, output_path)
             
-            links_removed = 0
-            annotations_removed = 0
-            watermarks_removed = 0
+            # Incremental saves append to the file the document was opened from, so
+            # decide up front. 'auto' appends when only annotations can change.
+            incremental = save_strategy == 'incremental' or (save_strategy == 'auto' and not remove_watermarks)
+            if incremental:
+                doc, copy_path = self._open_for_incremental(input_path, output_path, overwrite_original)
+            if doc is None:
+                incremental = False
+                use_mmap = options.get('use_mmap', False) if options else False
+                doc = open_document(input_path, use_mmap)
             
-            # Pre-scan for repeated XObjects (likely watermarks)
-            watermark_xrefs = set()
-            if remove_watermarks:
-                xref_counts = {}
-                for p in doc:
-                    # get_xobjects returns list of items, handle variable length
-                    for item in p.get_xobjects():
-                        xo_xref = item[0]
-                        xref_counts[xo_xref] = xref_counts.get(xo_xref, 0) + 1
-                
-                # Identify XRefs that appear on more than 1 page
-                watermark_xrefs = {x for x, count in xref_counts.items() if count > 1}
+            stats = self._clean_pages(doc, remove_links, remove_annotations, remove_watermarks,
+                                      self._page_windows(doc, options, baseline))
             
-            for page in doc:
-                # 1. Remove Links
-                if remove_links:
-                    # Remove standard link annotations
-                    for link in page.get_links():
-                        if link:
-                            page.delete_link(link)
-                            links_removed += 1
-                
-                # 2. Remove All Annotations (including highlights, stamps, etc.)
-                if remove_annotations:
-                    annots_to_remove = []
-                    for annot in page.annots():
-                        annots_to_remove.append(annot)
-                    
-                    for annot in annots_to_remove:
-                        page.delete_annot(annot)
-                        annotations_removed += 1
-                
-                # 3. If remove_links is on, also check annotations for URI actions
-                elif remove_links:
-                    annots_to_remove = []
-                    for annot in page.annots():
-                        # Check if annot has a URI action
-                        info = annot.info
-                        if 'uri' in str(info).lower() or annot.type[0] == fitz.PDF_ANNOT_LINK:
-                            annots_to_remove.append(annot)
-                    
-                    for annot in annots_to_remove:
-                        page.delete_annot(annot)
-                        links_removed += 1
-                
-                # 4. Remove Watermarks (XObjects and Images)
-                if remove_watermarks:
-                    # Get the page's content stream
-                    xref = page.get_contents()[0] if page.get_contents() else None
-                    
-                    if xref:
-                        # Get raw content stream
-                        content_stream = doc.xref_stream(xref)
-                        
-                        if content_stream:
-                            modified = content_stream
-                            import re
-                            
-                            # 1. (Removed) Do NOT blindly remove UPDF watermark XObjects by name pattern
-                            # because user-added images might be named 'UPDFX...' if added via UPDF editor.
-                            # We now rely solely on the frequency detection below.
-                            # modified = re.sub(rb'/UPDFX\d+\s+Do', b'', modified)
-                            
-                            # 2. Remove repeated XObjects (likely watermarks)
-                            page_xobjects = page.get_xobjects()
-                            names_to_remove = set()
-                            
-                            for item in page_xobjects:
-                                xo_xref = item[0]
-                                xo_name = item[1]
-                                if xo_xref in watermark_xrefs:
-                                    names_to_remove.add(xo_name)
-                            
-                            for name in names_to_remove:
-                                # Create pattern for "/Name Do"
-                                # handle encoding carefully
-                                try:
-                                    name_bytes = name.encode('ascii')
-                                    # Pattern: /Name Do
-                                    # Use regex escape to handle potential special chars in name
-                                    pattern = rb'/' + re.escape(name_bytes) + rb'\s+Do'
-                                    modified = re.sub(pattern, b'', modified)
-                                except:
-                                    pass # Skip if name encoding fails
-                            
-                            # Update the content stream if modified
-                            if modified != content_stream:
-                                doc.update_stream(xref, modified)
-                                watermarks_removed += 1
-                    
-                    # Remove images in watermark positions (top-left corner, typically < 200 points from top)
-                    images = page.get_images(full=True)
-                    for img in images:
-                        xref = img[0]
-                        rects = page.get_image_rects(xref)
-                        
-                        for rect in rects:
-                            # Check if image is in typical watermark position
-                            if rect.y0 < 150 and rect.x0 < 150:  # Top-left corner
-                                # This is likely a watermark logo
-                                # We need to remove it from the content stream
-                                # This is complex, so for now we'll mark it
-                                watermarks_removed += 1
+            # Nothing removed: skip the save, the original already is the result
+            if not self._is_changed(stats):
+                close_document(doc)
+                if not overwrite_original:
+                    unchanged_output = options.get('unchanged_output', 'copy') if options else 'copy'
+                    # The incremental path has already made a copy of the original
+                    _place_unchanged(input_path, output_path, unchanged_output, copy_path)
+                elif copy_path:
+                    os.remove(copy_path)
+                return self._result(stats, None, overwritten=False)
+            
+            strategy = self._resolve_strategy(save_strategy, incremental, stats)
             
             # If overwrite is enabled, save to original path
             if overwrite_original:
-                # Save to temp file first, then replace original
-                import tempfile
-                temp_fd, temp_path = tempfile.mkstemp(suffix='.pdf')
-                os.close(temp_fd)
+                # Save next to the original, then swap it in atomically
+                fsync = options.get('fsync', False) if options else False
+                if incremental:
+                    # The changes are appended to a copy of the original (a reflink where
+                    # possible), so a crash never leaves the original half-appended
+                    doc.save(copy_path, incremental=True, encryption=fitz.PDF_ENCRYPT_KEEP, no_new_id=True)
+                    temp_path = copy_path
+                    if fsync:
+                        with open(temp_path, 'rb+') as f:
+                            os.fsync(f.fileno())
+                else:
+                    _check_free_space(input_path)
+                    temp_path = _save_beside(doc, input_path, SAVE_PROFILES[strategy], fsync)
+                # Closing also unmaps the original: a mapping blocks the replace on Windows
+                close_document(doc)
+                _replace(temp_path, input_path, fsync)
                 
-                doc.save(temp_path, garbage=4, deflate=True, clean=True)
-                doc.close()
+                return self._result(stats, strategy, overwritten=True)
+            else:
+                # Outputs are also written beside their final name and swapped in, so an
+                # existing output (possibly a hard link to the original) is never written through
+                if incremental:
+                    # The document was opened from a copy beside output_path
+                    doc.save(copy_path, incremental=True, encryption=fitz.PDF_ENCRYPT_KEEP, no_new_id=True)
+                    temp_path = copy_path
+                else:
+                    # Clean the document to remove unused objects
+                    temp_path = _save_beside(doc, output_path, SAVE_PROFILES[strategy], mode_from=input_path)
+                close_document(doc)
+                _replace(temp_path, output_path)
                 
-                # Replace original with temp file
-                import shutil
-                shutil.move(temp_path, input_path)
+                return self._result(stats, strategy, overwritten=False)
+            
+        except Exception as e:
+            # Never leave the copy of the original behind
+            if doc is not None:
+                close_document(doc)
+            if copy_path and os.path.exists(copy_path):
+                os.remove(copy_path)
+            import traceback
+            return {
+                'success': False,
+                'error': str(e),
+                'traceback': traceback.format_exc()
+            }
+
+    def clean_bytes(self, data, options=None):
+        """
+        In-memory variant of clean_document: PDF bytes in, PDF bytes out.
+        Returns (cleaned_bytes, result); cleaned_bytes is None when cleaning failed.
+        """
+        buffer = io.BytesIO()
+        result = self.clean_stream(data, buffer, options)
+        return (buffer.getvalue() if result['success'] else None), result
+    
+    def clean_stream(self, source, destination, options=None):
+        """
+        Cleans a PDF read from source (bytes-like or binary file object) and writes
+        the result to destination (writable binary file object), without touching disk.
+        Same options and result dict as clean_document ('overwrite_original' and
+        'unchanged_output' do not apply); the output is byte-identical to what
+        clean_document writes.
+        """
+        try:
+            baseline = current_rss_bytes()
+            remove_links, remove_annotations, remove_watermarks, save_strategy = self._read_options(options)
+            if not isinstance(source, (bytes, bytearray, memoryview)):
+                source = source.read()
+            
+            doc = fitz.open(stream=source, filetype='pdf')
+            try:
+                incremental = save_strategy == 'incremental' or (save_strategy == 'auto' and not remove_watermarks)
+                incremental = incremental and doc.can_save_incrementally() and _incremental_writer_available()
                 
-                return {
-                    'success': True,
-                    'links_removed': links_removed,
-                    'annotations_removed': annotations_removed,
-                    'watermarks_removed': watermarks_removed,
-                    'overwritten': True
-                }
-            else:
-                # Clean the document to remove unused objects
-                doc.save(output_path, garbage=4, deflate=True, clean=True)
-                doc.close()
+                stats = self._clean_pages(doc, remove_links, remove_annotations, remove_watermarks,
+                                          self._page_windows(doc, options, baseline))
+                strategy = self._resolve_strategy(save_strategy, incremental, stats) if self._is_changed(stats) else None
                 
-                return {
-                    'success': True,
-                    'links_removed': links_removed,
-                    'annotations_removed': annotations_removed,
-                    'watermarks_removed': watermarks_removed,
-                    'overwritten': False
-                }
+                if strategy is None:
+                    # Nothing removed: pass the input through, like clean_document's 'copy'
+                    destination.write(source)
+                elif incremental:
+                    _write_incremental(doc, destination)
+                else:
+                    doc.save(destination, **SAVE_PROFILES[strategy])
+            finally:
+                doc.close()
+            
+            return self._result(stats, strategy, overwritten=False)
             
         except Exception as e:
             import traceback
@@ -165,6 +167,222 @@ class PDFCleaner:
                 'traceback': traceback.format_exc()
             }
 
+    def _read_options(self, options):
+        remove_links = options.get('remove_links', True) if options else True
+        remove_annotations = options.get('remove_annotations', False) if options else False
+        remove_watermarks = options.get('remove_watermarks', False) if options else False
+        save_strategy = options.get('save_strategy', 'auto') if options else 'auto'
+        if save_strategy not in SAVE_STRATEGIES:
+            save_strategy = 'auto'
+        return remove_links, remove_annotations, remove_watermarks, save_strategy
+
+    def _resolve_strategy(self, save_strategy, incremental, stats):
+        # Full garbage collection only pays off when streams were rewritten
+        if incremental:
+            return 'incremental'
+        if save_strategy in SAVE_PROFILES:
+            return save_strategy
+        return 'full' if stats['rewritten'] else 'fast'
+
+    def _page_windows(self, doc, options, baseline):
+        # Windowed processing keeps giant documents within a memory budget
+        window = options.get('page_window', 0) if options else 0
+        budget_mb = options.get('memory_budget_mb', 0) if options else 0
+        return PageWindows(len(doc), window, budget_mb * 1024 * 1024, baseline)
+
+    def _is_changed(self, stats):
+        # Every edit _clean_pages makes is counted
+        return bool(stats['links_removed'] or stats['annotations_removed'] or stats['watermarks_removed'])
+
+    def _result(self, stats, strategy, overwritten):
+        # strategy is None when nothing was saved ('changed': False)
+        return {
+            'success': True,
+            'links_removed': stats['links_removed'],
+            'annotations_removed': stats['annotations_removed'],
+            'watermarks_removed': stats['watermarks_removed'],
+            'changed': self._is_changed(stats),
+            'saved': strategy is not None,
+            'save_strategy': strategy,
+            'overwritten': overwritten
+        }
+
+    def _clean_pages(self, doc, remove_links, remove_annotations, remove_watermarks, pages=None):
+        """
+        Applies the removals to an open document in place.
+        pages: optional PageWindows controlling iteration and memory release; the
+               watermark pre-passes walk the document through it too.
+        Returns the removal counts plus 'rewritten' (content streams or images were replaced).
+        """
+        if pages is None:
+            pages = PageWindows(len(doc))
+        links_removed = 0
+        annotations_removed = 0
+        watermarks_removed = 0
+        
+        # Pre-scan for repeated XObjects (likely watermarks)
+        # The inventory reads each /Resources once; the removal phase below reuses it
+        watermark_xrefs = set()
+        watermark_images = {}
+        inventory = None
+        rewritten_streams = set() # (stream xref, names removed from it)
+        if remove_watermarks:
+            inventory = ResourceInventory(doc, pages)
+            
+            # Identify Form XObjects that appear on more than 1 page
+            watermark_xrefs = set(inventory.repeated(ResourceInventory.FORM, 2))
+            watermark_images = self._find_watermark_images(doc, inventory, pages)
+        
+        for pno in pages:
+            page = doc[pno]
+            # 1. Remove Links
+            if remove_links:
+                # Remove standard link annotations
+                for link in page.get_links():
+                    if link:
+                        page.delete_link(link)
+                        links_removed += 1
+            
+            # 2. Remove All Annotations (including highlights, stamps, etc.)
+            if remove_annotations:
+                annots_to_remove = []
+                for annot in page.annots():
+                    annots_to_remove.append(annot)
+                
+                for annot in annots_to_remove:
+                    page.delete_annot(annot)
+                    annotations_removed += 1
+            
+            # 3. If remove_links is on, also check annotations for URI actions
+            elif remove_links:
+                annots_to_remove = []
+                for annot in page.annots():
+                    # Check if annot has a URI action
+                    info = annot.info
+                    if 'uri' in str(info).lower() or annot.type[0] == fitz.PDF_ANNOT_LINK:
+                        annots_to_remove.append(annot)
+                
+                for annot in annots_to_remove:
+                    page.delete_annot(annot)
+                    links_removed += 1
+            
+            # 4. Remove Watermarks (XObjects and Images)
+            if remove_watermarks:
+                # 1. (Removed) Do NOT blindly remove UPDF watermark XObjects by name pattern
+                # because user-added images might be named 'UPDFX...' if added via UPDF editor.
+                # We now rely solely on the frequency detection below.
+                # modified = re.sub(rb'/UPDFX\d+\s+Do', b'', modified)
+                
+                # 2. Remove repeated XObjects (likely watermarks)
+                # Calls can sit in any of the page's content streams or inside
+                # (nested) Form XObjects, so group the targets by invoker
+                # (0 = the page itself, otherwise the calling form's xref)
+                targets_by_invoker = {}
+                for xo_name, xo_xref, invoker in inventory.calls(page.number):
+                    if xo_xref in watermark_xrefs:
+                        targets_by_invoker.setdefault(invoker, set()).add(xo_name)
+                
+                for invoker, names_to_remove in targets_by_invoker.items():
+                    # Pages without a repeated XObject never need their streams read
+                    stream_xrefs = page.get_contents() if invoker == 0 else [invoker]
+                    names_key = frozenset(names_to_remove)
+                    for xref in stream_xrefs:
+                        # Shared streams and forms are rewritten once per set of names:
+                        # pages sharing a stream may still name the watermark differently
+                        if (xref, names_key) in rewritten_streams:
+                            continue
+                        rewritten_streams.add((xref, names_key))
+                        watermarks_removed += self._remove_xobject_calls(doc, xref, names_to_remove)
+                
+        # 5. Neutralize watermark logos (repeated images in the top-left corner)
+        # Each image xref is replaced once, which clears it on every page using it
+        for xref, pno in watermark_images.items():
+            doc[pno].delete_image(xref)
+            watermarks_removed += 1
+        
+        return {
+            'links_removed': links_removed,
+            'annotations_removed': annotations_removed,
+            'watermarks_removed': watermarks_removed,
+            'rewritten': bool(rewritten_streams or watermark_images)
+        }
+
+    def _open_for_incremental(self, input_path, output_path, overwrite_original):
+        """
+        Opens the file an incremental save will append to: a byte copy of the original
+        in the directory of the file being replaced (the original itself when
+        overwriting, otherwise output_path).
+        Returns (doc, copy_path), or (None, None) when the document cannot be saved
+        incrementally (e.g. it needed repair). The copy is removed when this fails.
+        """
+        target = input_path if overwrite_original else output_path
+        _check_free_space(input_path, target)
+        copy_path = _temp_beside(target)
+        try:
+            _clone_file(input_path, copy_path)
+            doc = fitz.open(copy_path, filetype='pdf')
+        except BaseException as e:
+            os.remove(copy_path)
+            if isinstance(e, fitz.FileDataError):
+                # Name the user's file, not the temporary copy
+                raise fitz.FileDataError(str(e).replace(copy_path, input_path)) from None
+            raise
+        
+        if doc.can_save_incrementally():
+            return doc, copy_path
+        
+        doc.close()
+        os.remove(copy_path)
+        return None, None
+
+    def _find_watermark_images(self, doc, inventory, pages=None):
+        """
+        Picks images that look like a watermark logo: on more than half of the pages
+        (the threshold ImageDetector reports) and always placed entirely inside the
+        LOGO_CORNER square. Returns {xref: a page number it appears on}.
+        pages: page numbers to walk (default: all), e.g. a PageWindows.
+        """
+        repeated = set(inventory.repeated(ResourceInventory.IMAGE, ResourceInventory.majority(len(doc))))
+        if not repeated:
+            return {}
+        
+        # xref -> first page seen on; dropped as soon as a placement is elsewhere
+        candidates = {}
+        rejected = set()
+        for pno in pages if pages is not None else range(len(doc)):
+            if not repeated & inventory.page_xrefs(pno):
+                continue
+            # One call gives every placement on the page (instead of get_image_rects per image)
+            for info in doc[pno].get_image_info(xrefs=True):
+                xref = info['xref']
+                if xref not in repeated or xref in rejected:
+                    continue
+                x0, y0, x1, y1 = info['bbox']
+                if x0 >= 0 and y0 >= 0 and x1 <= self.LOGO_CORNER and y1 <= self.LOGO_CORNER:
+                    candidates.setdefault(xref, pno)
+                else:
+                    rejected.add(xref)
+                    candidates.pop(xref, None)
+        return candidates
+
+    def _remove_xobject_calls(self, doc, xref, names):
+        """
+        Rewrites one content stream (page contents or form) without the given XObject calls.
+        Returns the number of calls removed.
+        """
+        content_stream = doc.xref_stream(xref)
+        if not content_stream:
+            return 0
+        
+        # One tokenizing pass drops every targeted "/Name Do"
+        # (and q ... Q wrappers that only served it)
+        modified, report = remove_xobject_calls(content_stream, names)
+        
+        # Update the content stream if modified
+        if report['removed']:
+            doc.update_stream(xref, modified)
+        return sum(report['removed'].values())
+
     def generate_output_path(self, input_path):
         """
         Generates a default output path (e.g., encoded_filename -> cleaned_filename).
@@ -174,3 +392,164 @@ class PDFCleaner:
         name, ext = os.path.splitext(filename)
         new_name = f"cleaned_{name}{ext}"
         return os.path.join(directory, new_name)
+
+
+def _check_free_space(path, destination=None, headroom=1.1):
+    """
+    Raises OSError when destination's volume (default: path's) cannot hold a
+    rewritten copy of path. The rewrite is normally no larger than the original;
+    headroom covers the rest.
+    """
+    import shutil
+    needed = int(os.path.getsize(path) * headroom)
+    free = shutil.disk_usage(os.path.dirname(os.path.abspath(destination or path))).free
+    if free < needed:
+        raise OSError(f"Not enough free space to overwrite {os.path.basename(path)}: "
+                      f"{needed // 1024:,} KB needed, {free // 1024:,} KB free")
+
+
+def _check_output_path(input_path, output_path):
+    """
+    Refuses an output path that names the input file itself. (A hard link to the
+    input is fine: outputs are swapped in by rename, which only replaces the link.)
+    """
+    if os.path.normcase(os.path.realpath(input_path)) == os.path.normcase(os.path.realpath(output_path)):
+        raise ValueError("The output path is the input file; use overwrite to replace originals")
+
+
+def _temp_beside(path):
+    """Creates an empty temporary file in path's directory and returns its path"""
+    import tempfile
+    directory, name = os.path.split(os.path.abspath(path))
+    temp_fd, temp_path = tempfile.mkstemp(prefix=f'.{name}.', suffix='.tmp', dir=directory)
+    os.close(temp_fd)
+    return temp_path
+
+
+def _save_beside(doc, path, save_options, fsync=False, mode_from=None):
+    """
+    Saves doc to a temporary file in path's directory and returns its path.
+    Same directory means same file system, so the final swap is a rename, not a copy.
+    mode_from: file whose permissions the result gets (default: path itself)
+    """
+    import shutil
+    temp_path = _temp_beside(path)
+    try:
+        doc.save(temp_path, **save_options)
+        # mkstemp creates the file owner-only; keep the original's permissions
+        shutil.copymode(mode_from or path, temp_path)
+        if fsync:
+            with open(temp_path, 'rb+') as f:
+                os.fsync(f.fileno())
+    except BaseException:
+        os.remove(temp_path)
+        raise
+    return temp_path
+
+
+def _replace(temp_path, path, fsync=False):
+    """Atomically replaces path with temp_path (readers see the old or the new file, never a mix)"""
+    try:
+        os.replace(temp_path, path)
+    except BaseException:
+        os.remove(temp_path)
+        raise
+    if fsync and os.name == 'posix':
+        # Make the rename itself durable
+        dir_fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+
+
+def _place_unchanged(input_path, output_path, mode, copy_path=None):
+    """
+    Puts an untouched original at output_path without rewriting it (see UNCHANGED_OUTPUTS).
+    copy_path: a byte copy of the original beside output_path, already made (consumed).
+    Like every output, the result is swapped in by rename: an existing output_path,
+    even one hard-linked to the original, is replaced and never written through.
+    """
+    if mode not in UNCHANGED_OUTPUTS:
+        mode = 'copy'
+    if copy_path and mode != 'copy':
+        os.remove(copy_path)
+        copy_path = None
+    if mode == 'skip':
+        return
+    if mode == 'link' and os.path.exists(output_path) and os.path.samefile(input_path, output_path):
+        return # already a link to the original
+    
+    temp_path = copy_path
+    if temp_path is None:
+        temp_path = _temp_beside(output_path)
+        try:
+            if mode == 'link':
+                os.remove(temp_path)
+                try:
+                    os.link(input_path, temp_path)
+                except OSError:
+                    # Other volume, or a file system without hard links
+                    _clone_file(input_path, temp_path)
+            else:
+                _clone_file(input_path, temp_path)
+        except BaseException:
+            if os.path.lexists(temp_path):
+                os.remove(temp_path)
+            raise
+    _replace(temp_path, output_path)
+
+
+def _clone_file(source, destination):
+    """
+    Copies a file (with its permission bits), sharing its blocks (reflink) where
+    the file system can. destination is truncated: pass a fresh path, never one
+    that may be a hard link to source.
+    """
+    import shutil
+    if os.path.exists(destination) and os.path.samefile(source, destination):
+        raise ValueError(f"{destination} is the source file itself")
+    _copy_data(source, destination)
+    shutil.copymode(source, destination)
+
+
+def _copy_data(source, destination):
+    import shutil
+    try:
+        import fcntl
+        FICLONE = 0x40049409 # Linux: Btrfs, XFS, bcachefs, ...
+        with open(source, 'rb') as src, open(destination, 'wb') as dst:
+            try:
+                fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+                return
+            except OSError:
+                pass
+    except ImportError:
+        pass
+    shutil.copyfile(source, destination)
+
+
+def _incremental_writer_available():
+    try:
+        from pymupdf import mupdf
+        return hasattr(fitz, '_as_pdf_document') and hasattr(mupdf, 'pdf_write_document')
+    except ImportError:
+        return False
+
+
+def _write_incremental(doc, destination):
+    """
+    Writes an incremental save of a document opened from memory: the original
+    bytes followed by the update section, exactly as an incremental save to the
+    original file would. (Document.save only appends to files it was opened from.)
+    """
+    from pymupdf import mupdf
+    
+    opts = mupdf.PdfWriteOptions()
+    opts.do_incremental = 1
+    opts.dont_regenerate_id = 1
+    buffer = mupdf.fz_new_buffer(1024)
+    output = mupdf.FzOutput(buffer)
+    mupdf.pdf_write_document(fitz._as_pdf_document(doc), output, opts)
+    output.fz_close_output()
+    destination.write(mupdf.fz_buffer_storage_memoryview(buffer))
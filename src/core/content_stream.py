@@ -0,0 +1,169 @@
+"""
+Single-pass rewriting of PDF content streams.
+The stream is tokenized once; targeted XObject calls ("/Name Do") are dropped
+together with any q ... Q block that exists only to draw them, and the result
+is assembled with one final join.
+"""
+import re
+
+# One token per match, leading whitespace skipped. Literal strings and inline
+# image data need balanced/binary scanning and are handled separately.
+_TOKEN = re.compile(
+    rb'[\x00\t\n\x0c\r ]*(?:'
+    rb'(?P<comment>%[^\r\n]*)'
+    rb'|(?P<name>/[^\x00\t\n\x0c\r ()<>\[\]{}/%]*)'
+    rb'|(?P<dict><<|>>)'
+    rb'|(?P<hex><[^>]*>)'
+    rb'|(?P<array>[\[\]{}])'
+    rb'|(?P<string>\()'
+    rb'|(?P<word>[^\x00\t\n\x0c\r ()<>\[\]{}/%]+)'
+    rb')'
+)
+_STRING_PART = re.compile(rb'\\.|[()]', re.S)
+_INLINE_IMAGE_END = re.compile(rb'[\x00\t\n\x0c\r ]EI(?=[\x00\t\n\x0c\r /\[<(%]|$)')
+_NAME_ESCAPE = re.compile(rb'#([0-9A-Fa-f]{2})')
+
+# Operators that only change graphics state. A q ... Q block made of these plus
+# removed XObject calls draws nothing else and can go entirely.
+_STATE_OPERATORS = frozenset([
+    b'cm', b'gs', b'w', b'J', b'j', b'M', b'd', b'ri', b'i',
+    b'CS', b'cs', b'SC', b'SCN', b'sc', b'scn', b'G', b'g', b'RG', b'rg', b'K', b'k',
+    b'BMC', b'BDC', b'EMC', b'MP', b'DP',
+])
+
+
+def remove_xobject_calls(data, names):
+    """
+    Removes every "/Name Do" for the given XObject names from a content stream.
+    A q ... Q block is removed as a whole when, apart from removed calls, it
+    only holds graphics-state operators.
+    Returns (new_data, report) where report is
+        {'removed': {name: count}, 'blocks_removed': int}
+    new_data is the original object when nothing was removed.
+    """
+    report = {'removed': {}, 'blocks_removed': 0}
+    targets = {_encode_name(name): name for name in names}
+    if not data or not targets:
+        return data, report
+
+    spans = [] # (start, end) byte ranges to drop, in stream order
+    stack = [] # open q blocks
+    frame = _new_frame(0, 0) # page level
+    operand_start = None
+    operand_name = None
+    operand_count = 0
+    pos = 0
+    end = len(data)
+
+    while pos < end:
+        match = _TOKEN.match(data, pos)
+        if match is None or match.end() == pos:
+            break # trailing whitespace or malformed data
+        kind = match.lastgroup
+        tok_start = match.start(kind)
+        pos = match.end()
+
+        if kind == 'comment':
+            continue
+        if kind != 'word' or _is_operand_word(match.group(kind)):
+            # Operand
+            if operand_start is None:
+                operand_start = tok_start
+            operand_count += 1
+            operand_name = match.group(kind) if kind == 'name' else None
+            if kind == 'string':
+                pos = _skip_string(data, pos)
+            continue
+
+        op = match.group(kind)
+        if op == b'Do':
+            target = targets.get(_decode_name(operand_name)) if operand_name and operand_count == 1 else None
+            if target is not None:
+                spans.append((operand_start, pos))
+                report['removed'][target] = report['removed'].get(target, 0) + 1
+                frame['removed'] = True
+            else:
+                frame['content'] = True
+        elif op == b'q':
+            stack.append(frame)
+            frame = _new_frame(tok_start, len(spans))
+        elif op == b'Q':
+            if stack:
+                block, frame = frame, stack.pop()
+                if block['removed'] and not block['content']:
+                    # Block only existed to draw removed XObjects - drop it whole
+                    del spans[block['span_index']:]
+                    spans.append((block['start'], pos))
+                    report['blocks_removed'] += 1
+                    frame['removed'] = True
+                else:
+                    frame['removed'] = frame['removed'] or block['removed']
+                    frame['content'] = frame['content'] or block['content']
+        elif op == b'ID':
+            # Inline image data is binary - jump straight to its EI
+            image_end = _INLINE_IMAGE_END.search(data, pos + 1)
+            pos = image_end.end() if image_end else end
+            frame['content'] = True
+        elif op not in _STATE_OPERATORS:
+            frame['content'] = True
+
+        operand_start = None
+        operand_name = None
+        operand_count = 0
+
+    if not spans:
+        return data, report
+
+    # Assemble once; a space keeps the neighbouring tokens apart
+    view = memoryview(data)
+    parts = []
+    last = 0
+    for start, stop in spans:
+        parts.append(view[last:start])
+        last = stop
+    parts.append(view[last:])
+    return b' '.join(parts), report
+
+
+def _new_frame(start, span_index):
+    return {'start': start, 'span_index': span_index, 'removed': False, 'content': False}
+
+
+def _is_operand_word(word):
+    return word[:1] in b'0123456789+-.' or word in (b'true', b'false', b'null')
+
+
+def _skip_string(data, pos):
+    """Returns the position after the literal string whose '(' ends at pos"""
+    depth = 1
+    for match in _STRING_PART.finditer(data, pos):
+        char = match.group()
+        if char == b'(':
+            depth += 1
+        elif char == b')':
+            depth -= 1
+            if not depth:
+                return match.end()
+    return len(data)
+
+
+def decode_name(name):
+    """
+    Resolves #xx escapes of a PDF name (without the leading slash):
+    'Fm#200' -> b'Fm 0'. Names are compared as raw bytes everywhere.
+    """
+    if isinstance(name, str):
+        name = name.encode('latin-1')
+    if b'#' in name:
+        name = _NAME_ESCAPE.sub(lambda m: bytes([int(m.group(1), 16)]), name)
+    return name
+
+
+def _encode_name(name):
+    # An already decoded name: one character per byte
+    return name.encode('latin-1') if isinstance(name, str) else name
+
+
+def _decode_name(token):
+    """b'/Fm#200' -> b'Fm 0'"""
+    return decode_name(token[1:])
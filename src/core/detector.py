@@ -1,74 +1,288 @@
-import fitz
-from collections import Counter
+import re
+import zlib
+from array import array
+
+import numpy as np
+
+from src.core.document_loader import opened_document
+from src.core.resource_inventory import ResourceInventory
+
+_DIGITS = re.compile(r'\d+')
+_WHITESPACE = re.compile(r'\s+')
+# Digits are only folded in header/footer blocks with at least this many letters:
+# a stamp such as "Downloaded by ... on 2024-05-01" still matches itself across
+# pages, while short labels ("Page 12") and body text keep their numbers
+_MIN_FOLD_LETTERS = 12
+
+class LinkDetector:
+    """Link annotations. Conclusive on their own."""
+    key = 'links'
+    cost = 1
+    conclusive = True
+    decisive = True
+
+    def detect(self, doc, page_numbers):
+        link_count = 0
+        for pno in page_numbers:
+            link_count += len(doc[pno].get_links())
+        return link_count, []
+
+
+class ProducerDetector:
+    """
+    Producer/creator metadata of tools known to stamp their watermark.
+    Informational only: the metadata survives cleaning, so it must not make
+    a cleaned file scan as marked.
+    """
+    key = 'producer'
+    cost = 0
+    conclusive = False
+    decisive = False
+    SIGNATURES = ('UPDF',)
+
+    def detect(self, doc, page_numbers):
+        metadata = doc.metadata or {}
+        for field in ('producer', 'creator'):
+            value = metadata.get(field) or ''
+            for signature in self.SIGNATURES:
+                if signature.lower() in value.lower():
+                    return signature, []
+        return '', []
+
+
+class ImageDetector:
+    """
+    Images that appear on multiple pages.
+    If an image xref appears on > 50% of pages, it's likely a watermark/background.
+    1x1 images are skipped: cleaning leaves one in place of each removed logo
+    (and a single pixel cannot be a visible watermark anyway).
+    """
+    key = 'images'
+    cost = 2
+    conclusive = False
+    decisive = True
+
+    def detect(self, doc, page_numbers):
+        scanned = len(page_numbers)
+        # Per-xref page counts come from the shared inventory, not per-page lists
+        inventory = ResourceInventory(doc, page_numbers)
+        img_counts = {
+            xref: inventory.page_counts[xref]
+            for xref in inventory.repeated(ResourceInventory.IMAGE, 2)
+            if not _is_placeholder_image(doc, xref)
+        }
+        repeated_images = [xref for xref, count in img_counts.items() if count >= ResourceInventory.majority(scanned)]
+        return len(repeated_images), [count / scanned for count in img_counts.values()]
+
+
+class TextPatternDetector:
+    """
+    Text blocks repeated at the same position on > 50% of the pages.
+    Blocks are reduced to (page, signature, normalized centre) rows in flat
+    arrays and clustered with NumPy, so no per-block strings are kept.
+    """
+    key = 'text_patterns'
+    cost = 3
+    conclusive = False
+    decisive = True
+    # Optimization: Limit to first 50 pages for text pattern detection if doc is huge
+    MAX_PAGES = 50
+    # Repeats must land in the same cell of this grid (fraction of page size)
+    CELL_SIZE = 0.05
+    # Header/footer band height (fraction of page height) where digits may vary
+    MARGIN_BAND = 0.12
+
+    def detect(self, doc, page_numbers):
+        page_numbers = page_numbers[:self.MAX_PAGES]
+        scanned = len(page_numbers)
+        
+        pages = array('I')
+        blocks = array('I')
+        signatures = array('I')
+        centres = array('d')
+        for pno in page_numbers:
+            page = doc[pno]
+            width = page.rect.width or 1
+            height = page.rect.height or 1
+            # "blocks" -> (x0, y0, x1, y1, "text", block_no, block_type)
+            for block in page.get_text("blocks"):
+                if block[6] != 0:
+                    continue # image block
+                cx = (block[0] + block[2]) / 2 / width
+                cy = (block[1] + block[3]) / 2 / height
+                in_margin = cy < self.MARGIN_BAND or cy > 1 - self.MARGIN_BAND
+                text = _normalize_text(block[4], fold_digits=in_margin)
+                if len(text) <= 3: # Ignore very short artifacts
+                    continue
+                pages.append(pno)
+                blocks.append(block[5])
+                signatures.append(zlib.crc32(text.encode('utf-8')))
+                centres.append(cx)
+                centres.append(cy)
+        
+        if not pages:
+            return [], []
+        
+        page_arr = np.frombuffer(pages, dtype=np.uint32)
+        xy = np.frombuffer(centres, dtype=np.float64).reshape(-1, 2)
+        # Same signature in the same grid cell = same cluster
+        cells = np.minimum((xy / self.CELL_SIZE).astype(np.uint64), 255)
+        keys = (np.frombuffer(signatures, dtype=np.uint32).astype(np.uint64) << np.uint64(16)) \
+            | (cells[:, 0] << np.uint64(8)) | cells[:, 1]
+        
+        # Count distinct pages per cluster (a block repeated on one page counts once)
+        pairs = np.unique(np.stack([keys, page_arr.astype(np.uint64)], axis=1), axis=0)
+        cluster_keys, page_hits = np.unique(pairs[:, 0], return_counts=True)
+        
+        ratios = [float(count) / scanned for count in page_hits[page_hits > 1]]
+        threshold = max(1, scanned * 0.5)
+        
+        patterns = []
+        for key, count in zip(cluster_keys[page_hits > threshold], page_hits[page_hits > threshold]):
+            # Re-read one occurrence for a human-readable sample
+            first = int(np.argmax(keys == key))
+            pno, block_no = pages[first], blocks[first]
+            text = next((b[4].strip() for b in doc[pno].get_text("blocks") if b[5] == block_no), '')
+            patterns.append({
+                'text': text,
+                'count': int(count),
+                'position': [round(float(xy[first, 0]), 3), round(float(xy[first, 1]), 3)]
+            })
+        return patterns, ratios
+
 
 class WatermarkDetector:
+    # Bump whenever detection results change, so cached scans are discarded
+    VERSION = 8
+    
+    DEFAULT_SAMPLE_PAGES = 30
+    # Repeat ratios closer than this to the 50% threshold make a sample ambiguous
+    AMBIGUITY_MARGIN = 0.4
+    # Run cheapest first, so a verdict-only scan stops as early as possible
+    DETECTORS = (ProducerDetector, LinkDetector, ImageDetector, TextPatternDetector)
+
+    def __init__(self, mode='full', sample_pages=DEFAULT_SAMPLE_PAGES, detail='full', detectors=None,
+                 use_mmap=False):
+        """
+        mode: 'full' scans every page; 'fast' scans a stratified sample of
+              sample_pages pages and only falls back to a full scan when the
+              sample is ambiguous.
+        detail: 'full' runs every detector; 'verdict' stops at the first one
+                that finds a watermark (enough for a clean/marked status).
+        detectors: detector instances to run instead of DETECTORS.
+        use_mmap: memory-map the file instead of reading it into memory.
+        """
+        self.mode = mode
+        self.sample_pages = max(3, sample_pages)
+        self.detail = detail
+        self.use_mmap = use_mmap
+        if detectors is None:
+            detectors = [cls() for cls in self.DETECTORS]
+        self.detectors = sorted(detectors, key=lambda d: d.cost)
+
     def scan_pdf(self, pdf_path):
         """
         Scans a PDF for potential watermarks.
         Returns a dict with detection results.
         """
         try:
-            doc = fitz.open(pdf_path)
-            page_count = len(doc)
-            
-            # results container
-            detections = {
-                'links': 0,
-                'text_patterns': [],
-                'images': 0,
-                'encrypted': doc.is_encrypted
-            }
-            
-            # 1. Link Detection & Image Counting
-            link_count = 0
-            all_images = []
-            
-            for page in doc:
-                # Links
-                link_count += len(list(page.get_links()))
-                
-                # Images (just counting for now, advanced detection would match XREFs)
-                # get_images returns list of (xref, smask, width, height, bpc, colorspace, alt. colorspace, name, filter, referencer)
-                imgs = page.get_images(full=False)
-                all_images.extend([img[0] for img in imgs]) # Store xrefs
-
-            detections['links'] = link_count
-            
-            # Image Analysis: Find images that appear on multiple pages
-            # If an image xref appears on > 50% of pages, it's likely a watermark/background
-            img_counts = Counter(all_images)
-            repeated_images = [xref for xref, count in img_counts.items() if count > max(1, page_count * 0.5)]
-            detections['images'] = len(repeated_images)
-
-            # 2. Text Pattern Detection
-            # Heuristic: Text lines that appear on > 50% of pages
-            # To save time on large docs, maybe only scan first 10, middle 10, last 10? 
-            # For now, let's scan all but be careful with memory.
-            
-            line_counter = Counter()
-            
-            # Optimization: Limit to first 50 pages for text pattern detection if doc is huge
-            pages_to_scan = range(min(page_count, 50))
-            
-            for i in pages_to_scan:
-                page = doc[i]
-                # "blocks" -> (x0, y0, x1, y1, "text", block_no, block_type)
-                text_blocks = page.get_text("blocks")
-                for block in text_blocks:
-                    text = block[4].strip()
-                    if text and len(text) > 3: # Ignore very short artifacts
-                        line_counter[text] += 1
-            
-            # Filter patterns
-            threshold = max(1, len(pages_to_scan) * 0.5)
-            detections['text_patterns'] = [
-                {'text': text, 'count': count} 
-                for text, count in line_counter.items() 
-                if count > threshold
-            ]
-            
-            doc.close()
-            return detections
-            
+            with opened_document(pdf_path, self.use_mmap) as doc:
+                return self.scan_document(doc)
         except Exception as e:
             return {'error': str(e)}
+
+    def scan_document(self, doc):
+        """
+        Runs detection on an already opened document.
+        """
+        page_count = len(doc)
+        
+        if self.mode == 'fast' and page_count > self.sample_pages:
+            sample = self._sample_page_numbers(page_count)
+            detections = self._scan_pages(doc, sample)
+            detections['mode'] = 'fast'
+            if detections['confidence'] >= self.AMBIGUITY_MARGIN:
+                return detections
+            # Sample too close to call - pay for the full scan
+            escalated = True
+        else:
+            escalated = False
+        
+        detections = self._scan_pages(doc, range(page_count))
+        detections['mode'] = 'full'
+        detections['confidence'] = 1.0
+        detections['escalated'] = escalated
+        return detections
+
+    def _sample_page_numbers(self, page_count):
+        """
+        Stratified sample: a third of the budget from the start, a third from the
+        end and the rest spread evenly over the middle.
+        """
+        edge = self.sample_pages // 3
+        middle_count = self.sample_pages - 2 * edge
+        middle_span = page_count - 2 * edge
+        step = middle_span / middle_count
+        middle = {edge + int(i * step + step / 2) for i in range(middle_count)}
+        return sorted(set(range(edge)) | middle | set(range(page_count - edge, page_count)))
+
+    def _scan_pages(self, doc, page_numbers):
+        page_numbers = list(page_numbers)
+        
+        # results container; a detector skipped by an early exit leaves no key
+        detections = {
+            'pages': len(doc),
+            'sampled_pages': len(page_numbers),
+            'encrypted': doc.is_encrypted,
+            'escalated': False,
+            'verdict': 'clean',
+            'complete': True
+        }
+        
+        ratios = []
+        conclusive = False
+        for index, detector in enumerate(self.detectors):
+            value, detector_ratios = detector.detect(doc, page_numbers)
+            detections[detector.key] = value
+            ratios += detector_ratios
+            if value and detector.decisive:
+                detections['verdict'] = 'marked'
+                conclusive = conclusive or detector.conclusive
+                if self.detail == 'verdict':
+                    detections['complete'] = index == len(self.detectors) - 1
+                    break
+        
+        # Confidence: how far the recurring items sit from the 50% threshold.
+        # Conclusive findings (links) settle it on their own.
+        if conclusive:
+            detections['confidence'] = 1.0
+        else:
+            detections['confidence'] = min((abs(r - 0.5) / 0.5 for r in ratios), default=1.0)
+        
+        return detections
+
+
+def _is_placeholder_image(doc, xref):
+    """True for 1x1 images, e.g. what Page.delete_image leaves behind"""
+    return all(doc.xref_get_key(xref, key) == ('int', '1') for key in ('Width', 'Height'))
+
+
+def _normalize_text(text, fold_digits=False):
+    """
+    Fuzzy signature text: case and whitespace ignored. With fold_digits, digits
+    (page numbers, dates) are ignored too when the block has enough other text
+    to be recognisable.
+    """
+    text = _WHITESPACE.sub(' ', text.lower()).strip()
+    if fold_digits and sum(c.isalpha() for c in text) >= _MIN_FOLD_LETTERS:
+        text = _DIGITS.sub('#', text)
+    return text
+
+
+def scan_job(pdf_path, mode='full', sample_pages=WatermarkDetector.DEFAULT_SAMPLE_PAGES, detail='full',
+             use_mmap=False):
+    """
+    Scans a single file. Lives at module level so worker processes can unpickle it.
+    use_mmap: memory-map the file instead of reading it into memory
+    """
+    return WatermarkDetector(mode, sample_pages, detail, use_mmap=use_mmap).scan_pdf(pdf_path)
@@ -0,0 +1,58 @@
+import mmap
+import os
+from contextlib import contextmanager
+
+import fitz
+
+
+def open_document(path, use_mmap=False):
+    """
+    Opens a PDF; close it with close_document.
+    With use_mmap the file is memory-mapped instead of read: processes on one
+    host then share the OS page cache rather than each holding a private copy.
+    Mapped inputs must not be modified by other programs while in use.
+    """
+    return _open_mapped(path) if use_mmap else fitz.open(path)
+
+
+@contextmanager
+def opened_document(path, use_mmap=False):
+    """Context manager form of open_document"""
+    doc = open_document(path, use_mmap)
+    try:
+        yield doc
+    finally:
+        close_document(doc)
+
+
+def _open_mapped(path):
+    """Opens a PDF over a read-only memory map of the file (no copy is made)"""
+    with open(path, 'rb') as f:
+        if not os.fstat(f.fileno()).st_size:
+            return fitz.open(path) # an empty file cannot be mapped; let fitz report it
+        mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    view = memoryview(mapping)
+    try:
+        doc = fitz.open(stream=view, filetype='pdf')
+    except Exception:
+        view.release()
+        mapping.close()
+        raise
+    doc._mapping = (view, mapping)
+    return doc
+
+
+def close_document(doc):
+    """
+    Closes a document and, if it was memory-mapped, unmaps the file
+    (the mapping would otherwise block replacing the file on Windows).
+    """
+    if not doc.is_closed:
+        doc.close()
+    mapping = getattr(doc, '_mapping', None)
+    if mapping:
+        view, mapped = mapping
+        doc._mapping = None
+        doc.stream = None # Document.close keeps its reference to the buffer
+        view.release()
+        mapped.close()
@@ -1,38 +1,75 @@
 import os
-import fitz  # PyMuPDF
+
+from src.core.document_loader import opened_document
 
 class FileManager:
     def resolve_paths(self, paths):
         """
         Takes a list of paths (files or directories) and returns a list of PDF file paths.
         """
-        pdf_files = []
+        return sorted(path for path, _ in self.iter_pdf_files(paths))
+
+    def iter_pdf_files(self, paths, recursive=True):
+        """
+        Lazily yields (path, size) for every PDF under the given files/directories
+        (only directly inside them when recursive is False).
+        Uses os.scandir, so directory entries come with their stat info and nothing
+        is collected up front - callers can act on each file as soon as it is found.
+        Each path is yielded once.
+        """
+        seen = set()
         for path in paths:
             if os.path.isfile(path):
-                if path.lower().endswith('.pdf'):
-                    pdf_files.append(os.path.abspath(path))
+                path = os.path.abspath(path)
+                if path.lower().endswith('.pdf') and path not in seen:
+                    seen.add(path)
+                    yield path, os.path.getsize(path)
             elif os.path.isdir(path):
-                for root, _, files in os.walk(path):
-                    for file in files:
-                        if file.lower().endswith('.pdf'):
-                            pdf_files.append(os.path.join(root, file))
-        return sorted(list(set(pdf_files)))
+                for entry in self._walk_pdfs(path, recursive):
+                    if entry.path not in seen:
+                        seen.add(entry.path)
+                        try:
+                            yield entry.path, entry.stat().st_size
+                        except OSError:
+                            continue
+
+    def _walk_pdfs(self, directory, recursive=True):
+        """Iterative scandir walk (no recursion limit on deep trees)"""
+        stack = [directory]
+        while stack:
+            current = stack.pop()
+            try:
+                with os.scandir(current) as it:
+                    entries = sorted(it, key=lambda e: e.name)
+            except OSError:
+                continue
+            
+            subdirs = []
+            for entry in entries:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        if recursive:
+                            subdirs.append(entry.path)
+                    elif entry.name.lower().endswith('.pdf') and entry.is_file():
+                        yield entry
+                except OSError:
+                    continue
+            # Reversed so directories are visited in name order
+            stack.extend(reversed(subdirs))
 
     def get_file_info(self, file_path):
         """
         Extracts metadata from a PDF file.
         """
         try:
-            doc = fitz.open(file_path)
-            info = {
-                'name': os.path.basename(file_path),
-                'path': file_path,
-                'pages': len(doc),
-                'size': os.path.getsize(file_path),
-                'valid': True
-            }
-            doc.close()
-            return info
+            with opened_document(file_path) as doc:
+                return {
+                    'name': os.path.basename(file_path),
+                    'path': file_path,
+                    'pages': len(doc),
+                    'size': os.path.getsize(file_path),
+                    'valid': True
+                }
         except Exception as e:
             print(f"Error reading {file_path}: {e}")
             return None
@@ -0,0 +1,67 @@
+import gc
+
+import fitz
+
+from src.utils.memory import current_rss_bytes, release_free_memory
+
+class PageWindows:
+    """
+    Iterates a document's page numbers in windows and releases memory between
+    windows: dead page objects are collected and MuPDF's resource store
+    (decoded fonts, images, streams) is emptied.
+    budget_bytes caps what the job adds to resident memory on top of baseline
+    (the RSS when the job started, so the interpreter itself is not charged).
+    The window halves while the job is over budget and grows back once there
+    is room; a job still over budget with one-page windows raises MemoryError
+    instead of pushing the machine into swap. Where resident memory cannot be
+    measured (see budget_enforceable) only the windowing applies.
+    window=0 and no budget: every page in one pass, nothing released.
+    The same instance can be iterated again, e.g. by each pass over a document.
+    """
+    DEFAULT_WINDOW = 256
+
+    def __init__(self, page_count, window=0, budget_bytes=0, baseline=None):
+        self.page_count = page_count
+        self.budget_bytes = budget_bytes
+        self.baseline = baseline or 0
+        if budget_bytes and not window:
+            window = self.DEFAULT_WINDOW
+        self.max_window = window
+        self.window = window
+
+    def __iter__(self):
+        if not self.window:
+            yield from range(self.page_count)
+            return
+        start = 0
+        while start < self.page_count:
+            end = min(start + self.window, self.page_count)
+            yield from range(start, end)
+            start = end
+            if start < self.page_count:
+                self.release()
+
+    def release(self):
+        """Frees what the finished window left behind and adapts the window size"""
+        gc.collect()
+        fitz.TOOLS.store_shrink(100)
+        release_free_memory()
+        if not self.budget_bytes:
+            return
+
+        rss = current_rss_bytes()
+        if rss is None:
+            return # cannot measure here (budget_enforceable() is False) - keep the window
+        used = rss - self.baseline
+        if used > self.budget_bytes:
+            if self.window == 1:
+                raise MemoryError(f"Memory budget exceeded: job uses {used // (1024 * 1024)} MB, "
+                                  f"budget {self.budget_bytes // (1024 * 1024)} MB")
+            self.window = max(1, self.window // 2)
+        elif used < self.budget_bytes // 2 and self.window < self.max_window:
+            self.window = min(self.max_window, self.window * 2)
+
+
+def budget_enforceable():
+    """Whether this platform lets PageWindows enforce a memory budget"""
+    return current_rss_bytes() is not None
@@ -0,0 +1,26 @@
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+
+def resolve_worker_count(requested=None):
+    """
+    Clamps a requested worker count (e.g. the 'thread_count' setting) to a sane value.
+    """
+    try:
+        count = int(requested) if requested else 0
+    except (TypeError, ValueError):
+        count = 0
+    if count < 1:
+        count = os.cpu_count() or 1
+    return max(1, count)
+
+
+def create_process_pool(max_workers):
+    """
+    Creates a process pool for PyMuPDF jobs.
+    PyMuPDF holds the GIL while parsing, so threads do not scale - processes do.
+    'spawn' is used everywhere because forking a process that runs Qt threads is unsafe.
+    """
+    context = multiprocessing.get_context('spawn')
+    return ProcessPoolExecutor(max_workers=max_workers, mp_context=context)
@@ -0,0 +1,159 @@
+import re
+from array import array
+
+from src.core.content_stream import decode_name
+
+_XOBJECT_ENTRY = re.compile(r'/([^\s/<>\[\]()]+)\s*(\d+)\s+\d+\s+R')
+
+
+class ResourceInventory:
+    """
+    Document-level index of the XObjects (images and forms) each page uses,
+    directly or through nested forms.
+    Every /Resources dictionary is read once and shared between the pages
+    (and forms) that reference it. Per-xref page counts live in flat arrays
+    indexed by xref, so memory follows the number of objects in the file,
+    not pages x images.
+    """
+
+    OTHER = 0
+    IMAGE = 1
+    FORM = 2
+
+    # /Parent chain depth searched for inherited resources
+    MAX_INHERITANCE_DEPTH = 32
+
+    def __init__(self, doc, page_numbers=None):
+        """
+        page_numbers: pages to index (default: all). Counts only cover these pages.
+        """
+        self.doc = doc
+        size = doc.xref_length()
+        # page_counts[xref] -> number of indexed pages using the XObject
+        self.page_counts = array('I', bytes(4 * size))
+        # Unknown until first looked up
+        self._kinds = bytearray(b'\xff') * size
+        self._maps = {} # resources holder xref -> ((name, xref), ...)
+        self._closures = {} # form xref -> frozenset of XObject xrefs it reaches
+        self._page_holders = {} # page number -> resources holder xref
+
+        if page_numbers is None:
+            page_numbers = range(len(doc))
+        for pno in page_numbers:
+            for xref in self.page_xrefs(pno):
+                self.page_counts[xref] += 1
+
+    def kind(self, xref):
+        """IMAGE, FORM or OTHER for an XObject xref"""
+        if xref >= len(self._kinds):
+            return self.OTHER
+        kind = self._kinds[xref]
+        if kind == 0xff:
+            subtype = self.doc.xref_get_key(xref, "Subtype")[1]
+            kind = self.IMAGE if subtype == '/Image' else self.FORM if subtype == '/Form' else self.OTHER
+            self._kinds[xref] = kind
+        return kind
+
+    @staticmethod
+    def majority(page_count):
+        """Fewest pages an XObject must be on to be on more than half of page_count (at least 2)"""
+        return max(2, page_count // 2 + 1)
+
+    def repeated(self, kind, min_pages):
+        """Yields xrefs of the given kind used on at least min_pages indexed pages"""
+        for xref, count in enumerate(self.page_counts):
+            if count >= min_pages and self.kind(xref) == kind:
+                yield xref
+
+    def page_xrefs(self, pno):
+        """Set of XObject xrefs a page draws, nested forms included"""
+        reached = set()
+        for _, xref in self._page_map(pno):
+            reached.add(xref)
+            if self.kind(xref) == self.FORM:
+                reached |= self._closure(xref)
+        return reached
+
+    def calls(self, pno):
+        """
+        Every XObject reference reachable from a page as (name, xref, invoker), name
+        being the decoded bytes (see content_stream.decode_name) and
+        invoker 0 for the page itself or the xref of the form using the name.
+        """
+        calls = [(name, xref, 0) for name, xref in self._page_map(pno)]
+        for form in self.page_xrefs(pno):
+            if self.kind(form) == self.FORM:
+                calls.extend((name, xref, form) for name, xref in self._form_map(form))
+        return calls
+
+    def _page_map(self, pno):
+        holder = self._page_holders.get(pno)
+        if holder is None:
+            holder = self._find_resources_holder(self.doc[pno].xref)
+            self._page_holders[pno] = holder
+        return self._xobject_map(holder)
+
+    def _form_map(self, form_xref):
+        return self._xobject_map(self._find_resources_holder(form_xref, inherit=False))
+
+    def _find_resources_holder(self, xref, inherit=True):
+        """
+        Returns the xref whose /XObject entry applies to this page/form: an indirect
+        /Resources object, or the page/form (or ancestor) holding an inline one.
+        Returns 0 when there are no resources.
+        """
+        for _ in range(self.MAX_INHERITANCE_DEPTH):
+            kind, value = self.doc.xref_get_key(xref, "Resources")
+            if kind == 'xref':
+                return -int(value.split()[0]) # negative: the xref is the Resources dict itself
+            if kind == 'dict':
+                return xref
+            if not inherit:
+                break
+            kind, value = self.doc.xref_get_key(xref, "Parent")
+            if kind != 'xref':
+                break
+            xref = int(value.split()[0])
+        return 0
+
+    def _xobject_map(self, holder):
+        if not holder:
+            return ()
+        mapping = self._maps.get(holder)
+        if mapping is None:
+            if holder < 0:
+                kind, value = self.doc.xref_get_key(-holder, "XObject")
+            else:
+                kind, value = self.doc.xref_get_key(holder, "Resources/XObject")
+            if kind == 'xref':
+                value = self.doc.xref_object(int(value.split()[0]), compressed=True)
+            elif kind != 'dict':
+                value = ''
+            size = len(self._kinds)
+            mapping = tuple(
+                (decode_name(name), int(xref))
+                for name, xref in _XOBJECT_ENTRY.findall(value)
+                if int(xref) < size
+            )
+            self._maps[holder] = mapping
+        return mapping
+
+    def _closure(self, form_xref, visiting=None):
+        """All XObject xrefs reached from a form, memoized per form"""
+        closure = self._closures.get(form_xref)
+        if closure is not None:
+            return closure
+
+        visiting = visiting or set()
+        visiting.add(form_xref)
+        reached = set()
+        for _, xref in self._form_map(form_xref):
+            reached.add(xref)
+            if xref not in visiting and self.kind(xref) == self.FORM:
+                reached |= self._closure(xref, visiting)
+        visiting.discard(form_xref)
+
+        closure = frozenset(reached)
+        self._closures[form_xref] = closure
+        return closure
+
@@ -0,0 +1,164 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from src.core.detector import WatermarkDetector
+
+
+class ScanCache:
+    """
+    Persistent cache of detection results, keyed by file fingerprint
+    (path, size, mtime and optionally a sampled content hash).
+    Re-adding an unchanged file is a lookup instead of a PDF parse.
+    Least recently used entries are evicted once the stored entries exceed
+    max_bytes. The whole cache is dropped when the detector version changes.
+    Safe to call from any thread; calls after close() are ignored.
+    """
+
+    SCHEMA_VERSION = 2
+    DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+    # Stored per entry besides path and result (fingerprint columns, index)
+    ENTRY_OVERHEAD_BYTES = 64
+    # Bytes hashed from each end of the file when content hashing is on
+    HASH_SAMPLE_BYTES = 64 * 1024
+
+    def __init__(self, db_path, detector_version=WatermarkDetector.VERSION,
+                 max_bytes=DEFAULT_MAX_BYTES, use_content_hash=False):
+        self.db_path = str(db_path)
+        self.version = f"{self.SCHEMA_VERSION}:{detector_version}"
+        self.max_bytes = max_bytes
+        self.use_content_hash = use_content_hash
+        self._lock = threading.Lock()
+        self._writes_since_trim = 0
+        self._closed = False
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._setup()
+
+    def _setup(self):
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)"
+            )
+            row = self._conn.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()
+            if row is None or row[0] != self.version:
+                # Results from another detector version (or table layout) are not comparable
+                self._conn.execute("DROP TABLE IF EXISTS scans")
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO meta (key, value) VALUES ('version', ?)", (self.version,)
+                )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS scans ("
+                " path TEXT PRIMARY KEY, size INTEGER, mtime_ns INTEGER,"
+                " content_hash TEXT, result TEXT, last_used REAL, bytes INTEGER)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS scans_last_used ON scans(last_used)")
+            self._trim()
+
+    def fingerprint(self, path):
+        """Returns (size, mtime_ns, content_hash) for path, or None if it cannot be read"""
+        try:
+            st = os.stat(path)
+            content_hash = self._content_hash(path, st.st_size) if self.use_content_hash else ''
+        except OSError:
+            return None
+        return (st.st_size, st.st_mtime_ns, content_hash)
+
+    def lookup(self, path):
+        """
+        Returns (result, fingerprint). result is None on a miss.
+        Keep the fingerprint and pass it to store() so a file that changes
+        while being scanned is not cached under its new stamp.
+        """
+        fingerprint = self.fingerprint(path)
+        if fingerprint is None:
+            return None, None
+        try:
+            with self._lock:
+                if self._closed:
+                    return None, fingerprint
+                row = self._conn.execute(
+                    "SELECT size, mtime_ns, content_hash, result FROM scans WHERE path = ?", (path,)
+                ).fetchone()
+                if row is None or tuple(row[:3]) != fingerprint:
+                    return None, fingerprint
+                with self._conn:
+                    self._conn.execute(
+                        "UPDATE scans SET last_used = ? WHERE path = ?", (time.time(), path)
+                    )
+            return json.loads(row[3]), fingerprint
+        except (sqlite3.Error, ValueError) as e:
+            print(f"Scan cache read failed: {e}")
+            return None, fingerprint
+
+    def store(self, path, fingerprint, result):
+        """Caches a successful detection result"""
+        if fingerprint is None or 'error' in result:
+            return
+        size, mtime_ns, content_hash = fingerprint
+        try:
+            data = json.dumps(result)
+            cost = len(path.encode('utf-8')) + len(data.encode('utf-8')) + self.ENTRY_OVERHEAD_BYTES
+            with self._lock:
+                if self._closed:
+                    # Scans still finishing after shutdown
+                    return
+                with self._conn:
+                    self._conn.execute(
+                        "INSERT OR REPLACE INTO scans"
+                        " (path, size, mtime_ns, content_hash, result, last_used, bytes)"
+                        " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                        (path, size, mtime_ns, content_hash, data, time.time(), cost)
+                    )
+                    self._writes_since_trim += 1
+                    if self._writes_since_trim >= 500:
+                        self._trim()
+        except (sqlite3.Error, TypeError) as e:
+            print(f"Scan cache write failed: {e}")
+
+    def total_bytes(self):
+        """Size of the stored entries, as counted against max_bytes"""
+        with self._lock:
+            if self._closed:
+                return 0
+            return self._conn.execute("SELECT COALESCE(SUM(bytes), 0) FROM scans").fetchone()[0]
+
+    def _trim(self):
+        """Evicts least recently used entries down to 90% of the size limit"""
+        self._writes_since_trim = 0
+        total = self._conn.execute("SELECT COALESCE(SUM(bytes), 0) FROM scans").fetchone()[0]
+        if total > self.max_bytes:
+            # Keep the most recently used entries that fit in the target size
+            self._conn.execute(
+                "DELETE FROM scans WHERE path IN ("
+                " SELECT path FROM (SELECT path, SUM(bytes) OVER"
+                "  (ORDER BY last_used DESC, path ROWS UNBOUNDED PRECEDING) AS kept FROM scans)"
+                " WHERE kept > ?)", (int(self.max_bytes * 0.9),)
+            )
+
+    def clear(self):
+        with self._lock:
+            if self._closed:
+                return
+            with self._conn:
+                self._conn.execute("DELETE FROM scans")
+
+    def close(self):
+        with self._lock:
+            if not self._closed:
+                self._closed = True
+                self._conn.close()
+
+    def _content_hash(self, path, size):
+        # Head + tail sample: catches rewrites that keep size and mtime
+        # without reading a multi-GB file end to end
+        digest = hashlib.blake2b(digest_size=16)
+        with open(path, 'rb') as f:
+            digest.update(f.read(self.HASH_SAMPLE_BYTES))
+            if size > self.HASH_SAMPLE_BYTES:
+                f.seek(max(self.HASH_SAMPLE_BYTES, size - self.HASH_SAMPLE_BYTES))
+                digest.update(f.read(self.HASH_SAMPLE_BYTES))
+        return digest.hexdigest()
@@ -1,15 +1,42 @@
 import sys
 import os
+import multiprocessing
+import time
+
+# Time origin for the startup benchmark (benchmarks/startup.py)
+_START_TIME = time.perf_counter()
 
 # Add project root to path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from PySide6.QtWidgets import QApplication
-from PySide6.QtGui import QIcon
-from src.ui.main_window import MainWindow
-from src.ui.styles.styles import apply_stylesheet
+# Qt and the UI are imported inside main(): worker processes are spawned, and each
+# one re-runs this module as __mp_main__, where loading Qt would only cost time and memory
+
+def first_paint_probe(parent):
+    """
+    Startup benchmark hook (WATERMARK_STARTUP_PROBE=1): an event filter that prints
+    the time to the window's first paint, then quits.
+    """
+    from PySide6.QtCore import QObject, QEvent, QTimer
+    from PySide6.QtWidgets import QApplication
+    
+    class FirstPaintProbe(QObject):
+        def eventFilter(self, obj, event):
+            if event.type() == QEvent.Paint:
+                obj.removeEventFilter(self)
+                elapsed_ms = (time.perf_counter() - _START_TIME) * 1000
+                print(f"first_paint_ms={elapsed_ms:.1f} fitz_loaded={'fitz' in sys.modules}", flush=True)
+                QTimer.singleShot(0, QApplication.instance().quit)
+            return False
+    
+    return FirstPaintProbe(parent)
 
 def main():
+    from PySide6.QtWidgets import QApplication
+    from PySide6.QtGui import QIcon
+    from src.ui.main_window import MainWindow
+    from src.ui.styles.styles import apply_stylesheet
+    
     app = QApplication(sys.argv)
     app.setApplicationName("WaterMarkEraser")
     app.setOrganizationName("Raafat Shahin")
@@ -22,16 +49,22 @@ def main():
     # Apply theme
     apply_stylesheet(app, theme)
     
-    window = MainWindow()
+    window = MainWindow(settings)
     
     # Set window icon
     icon_path = os.path.join(os.path.dirname(__file__), 'resources', 'logo.ico')
     if os.path.exists(icon_path):
         window.setWindowIcon(QIcon(icon_path))
     
+    if os.environ.get('WATERMARK_STARTUP_PROBE'):
+        probe = first_paint_probe(window)
+        window.installEventFilter(probe)
+    
     window.show()
     
     sys.exit(app.exec())
 
 if __name__ == '__main__':
+    # Required for worker processes in the frozen (PyInstaller) build
+    multiprocessing.freeze_support()
     main()
@@ -0,0 +1,235 @@
+from array import array
+
+from PySide6.QtCore import Qt, QAbstractTableModel, QModelIndex, QTimer, Signal
+from src.models.enums import FileStatus, STATUS_ICONS
+from src.models.statistics import FileStatistics
+
+class FileListModel(QAbstractTableModel):
+    """
+    Table model for the file queue.
+    Rows live in a columnar store (one array per numeric column, plain lists
+    for the strings, tooltips only where set), so 100k files cost a few MB
+    and no per-cell objects. Cell changes are coalesced into one dataChanged
+    per column range per event-loop pass.
+    """
+    statistics_changed = Signal() # totals in self.statistics moved (at most once per pass)
+
+    COLUMNS = ["✓", "Status", "Name", "Pages", "Size"]
+    COL_CHECK, COL_STATUS, COL_NAME, COL_PAGES, COL_SIZE = range(5)
+
+    # Shown when a row has no tooltip of its own
+    DEFAULT_TOOLTIPS = {FileStatus.QUEUED: "Waiting to scan..."}
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._paths = []
+        self._names = []
+        self._sizes = array('q')
+        self._pages = array('i') # -1 = unknown
+        self._statuses = bytearray() # FileStatus values
+        self._checked = bytearray()
+        self._tooltips = {} # row -> status tooltip
+        self._needs_details = set() # rows whose status tooltip is partial
+        self.statistics = FileStatistics()
+
+        # Pending dataChanged range: column -> [top, bottom]
+        self._dirty = {}
+        self._statistics_dirty = False
+        self._flush_pending = False
+        self._flush_timer = QTimer(self)
+        self._flush_timer.setSingleShot(True)
+        self._flush_timer.setInterval(0)
+        self._flush_timer.timeout.connect(self._flush_changes)
+
+    # --- Qt model interface ---
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._paths)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.COLUMNS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if orientation == Qt.Horizontal and role == Qt.DisplayRole:
+            return self.COLUMNS[section]
+        return super().headerData(section, orientation, role)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        row, col = index.row(), index.column()
+
+        if role == Qt.DisplayRole:
+            if col == self.COL_STATUS:
+                return STATUS_ICONS[FileStatus(self._statuses[row])]
+            if col == self.COL_NAME:
+                return self._names[row]
+            if col == self.COL_PAGES:
+                pages = self._pages[row]
+                return str(pages) if pages >= 0 else '-'
+            if col == self.COL_SIZE:
+                return self._format_size(self._sizes[row])
+        elif role == Qt.CheckStateRole and col == self.COL_CHECK:
+            return Qt.Checked if self._checked[row] else Qt.Unchecked
+        elif role == Qt.ToolTipRole:
+            if col == self.COL_STATUS:
+                tooltip = self._tooltips.get(row)
+                if tooltip is None:
+                    tooltip = self.DEFAULT_TOOLTIPS.get(FileStatus(self._statuses[row]))
+                return tooltip
+            if col == self.COL_NAME:
+                return self._paths[row]
+        elif role == Qt.TextAlignmentRole and col in (self.COL_STATUS, self.COL_PAGES, self.COL_SIZE):
+            return int(Qt.AlignCenter)
+        return None
+
+    def setData(self, index, value, role=Qt.EditRole):
+        if role == Qt.CheckStateRole and index.column() == self.COL_CHECK:
+            self.set_checked(index.row(), Qt.CheckState(value) == Qt.Checked)
+            return True
+        return False
+
+    def flags(self, index):
+        if not index.isValid():
+            return Qt.NoItemFlags
+        flags = Qt.ItemIsEnabled | Qt.ItemIsSelectable
+        if index.column() == self.COL_CHECK:
+            flags |= Qt.ItemIsUserCheckable
+        return flags
+
+    # --- Store API ---
+
+    def add_files(self, files_data):
+        """
+        Appends a batch of files with a single rowsInserted.
+        files_data: dicts containing 'name', 'path', 'pages' (or None), 'size'
+        Returns the row index of the first added file.
+        """
+        first_row = len(self._paths)
+        if not files_data:
+            return first_row
+
+        self.beginInsertRows(QModelIndex(), first_row, first_row + len(files_data) - 1)
+        for file_data in files_data:
+            self._paths.append(file_data.get('path', ''))
+            self._names.append(file_data.get('name', 'Unknown'))
+            self._sizes.append(file_data.get('size', 0) or 0)
+            pages = file_data.get('pages')
+            self._pages.append(pages if pages is not None else -1)
+        count = len(files_data)
+        self._statuses.extend(bytes([FileStatus.QUEUED.value]) * count)
+        self._checked.extend(b'\x01' * count)
+        self.endInsertRows()
+        self.statistics.add(count, sum(self._sizes[first_row:]))
+        self._mark_statistics_dirty()
+        return first_row
+
+    def clear(self):
+        self.beginResetModel()
+        self._paths = []
+        self._names = []
+        self._sizes = array('q')
+        self._pages = array('i')
+        self._statuses = bytearray()
+        self._checked = bytearray()
+        self._tooltips.clear()
+        self._needs_details.clear()
+        self._dirty.clear()
+        self.endResetModel()
+        self.statistics.reset()
+        self._mark_statistics_dirty()
+
+    def set_status(self, row, status, tooltip="", needs_details=False):
+        if not 0 <= row < len(self._paths):
+            return
+        self.statistics.change_status(FileStatus(self._statuses[row]), status)
+        self._statuses[row] = status.value
+        if tooltip:
+            self._tooltips[row] = tooltip
+        else:
+            self._tooltips.pop(row, None)
+        if needs_details:
+            self._needs_details.add(row)
+        else:
+            self._needs_details.discard(row)
+        self._mark_dirty(row, self.COL_STATUS)
+        self._mark_statistics_dirty()
+
+    def set_pages(self, row, pages):
+        if 0 <= row < len(self._paths):
+            self._pages[row] = pages
+            self._mark_dirty(row, self.COL_PAGES)
+
+    def set_checked(self, row, checked):
+        if 0 <= row < len(self._paths) and self._checked[row] != checked:
+            self._checked[row] = 1 if checked else 0
+            self.statistics.change_selected(1 if checked else -1)
+            self._mark_dirty(row, self.COL_CHECK)
+            self._mark_statistics_dirty()
+
+    def set_all_checked(self, checked):
+        if self._paths:
+            self._checked[:] = (b'\x01' if checked else b'\x00') * len(self._paths)
+            self._mark_dirty(0, self.COL_CHECK)
+            self._mark_dirty(len(self._paths) - 1, self.COL_CHECK)
+            self.statistics.selected = len(self._paths) if checked else 0
+            self._mark_statistics_dirty()
+
+    def take_details_request(self, row):
+        """True (once) if the row's status tooltip is partial"""
+        if row in self._needs_details:
+            self._needs_details.discard(row)
+            return True
+        return False
+
+    def status(self, row):
+        return FileStatus(self._statuses[row])
+
+    def is_checked(self, row):
+        return bool(self._checked[row])
+
+    def path(self, row):
+        return self._paths[row] if 0 <= row < len(self._paths) else None
+
+    def name(self, row):
+        return self._names[row] if 0 <= row < len(self._names) else None
+
+    def size(self, row):
+        return self._sizes[row]
+
+    # --- Change batching ---
+
+    def _mark_dirty(self, row, col):
+        span = self._dirty.get(col)
+        if span is None:
+            self._dirty[col] = [row, row]
+        else:
+            span[0] = min(span[0], row)
+            span[1] = max(span[1], row)
+        self._schedule_flush()
+
+    def _mark_statistics_dirty(self):
+        self._statistics_dirty = True
+        self._schedule_flush()
+
+    def _schedule_flush(self):
+        if not self._flush_pending:
+            self._flush_pending = True
+            self._flush_timer.start()
+
+    def _flush_changes(self):
+        self._flush_pending = False
+        dirty, self._dirty = self._dirty, {}
+        for col, (top, bottom) in dirty.items():
+            if bottom < len(self._paths):
+                self.dataChanged.emit(self.index(top, col), self.index(bottom, col))
+        if self._statistics_dirty:
+            self._statistics_dirty = False
+            self.statistics_changed.emit()
+
+    def _format_size(self, size_bytes):
+        for unit in ['B', 'KB', 'MB', 'GB']:
+            if size_bytes < 1024:
+                return f"{size_bytes:.1f} {unit}"
+            size_bytes /= 1024
+        return f"{size_bytes:.1f} TB"
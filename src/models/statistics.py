@@ -0,0 +1,43 @@
+from src.models.enums import FileStatus
+
+class FileStatistics:
+    """
+    Running totals for the file queue.
+    Updated on every add, status transition and check toggle, so reading
+    them is O(1) no matter how many files are listed.
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.total = 0
+        self.size_bytes = 0
+        self.selected = 0
+        self.by_status = dict.fromkeys(FileStatus, 0)
+
+    def add(self, count, size_bytes, status=FileStatus.QUEUED, selected=True):
+        self.total += count
+        self.size_bytes += size_bytes
+        self.by_status[status] += count
+        if selected:
+            self.selected += count
+
+    def change_status(self, old, new):
+        if old != new:
+            self.by_status[old] -= 1
+            self.by_status[new] += 1
+
+    def change_selected(self, delta):
+        self.selected += delta
+
+    def as_dict(self):
+        """Keyword arguments for StatisticsBar.update_stats"""
+        return {
+            'total': self.total,
+            'size_bytes': self.size_bytes,
+            'selected': self.selected,
+            'clean': self.by_status[FileStatus.CLEAN],
+            'marked': self.by_status[FileStatus.MARKED],
+            'errors': self.by_status[FileStatus.ERROR]
+        }
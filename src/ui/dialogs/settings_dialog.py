@@ -2,10 +2,25 @@ from PySide6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QTabWidget,
                                QWidget, QLabel, QLineEdit, QPushButton, QCheckBox,
                                QSpinBox, QComboBox, QFormLayout, QGroupBox)
 from PySide6.QtCore import Qt
+import os
+
+from src.utils.memory import current_rss_bytes
 
 class SettingsDialog(QDialog):
     """Settings dialog with multiple tabs"""
     
+    SAVE_STRATEGY_ITEMS = [
+        ("Auto", 'auto'),
+        ("Full rebuild (smallest file)", 'full'),
+        ("Fast (no sanitizing)", 'fast'),
+        ("Incremental (append changes)", 'incremental'),
+    ]
+    UNCHANGED_OUTPUT_ITEMS = [
+        ("Copy the original", 'copy'),
+        ("Hard-link the original", 'link'),
+        ("Don't write a file", 'skip'),
+    ]
+    
     def __init__(self, settings_manager, parent=None):
         super().__init__(parent)
         self.settings = settings_manager
@@ -84,6 +99,12 @@ class SettingsDialog(QDialog):
         self.chk_activity_log = QCheckBox("Show activity log")
         layout.addRow("", self.chk_activity_log)
         
+        # Activity log length (older lines stay in the log file)
+        self.spin_log_lines = QSpinBox()
+        self.spin_log_lines.setRange(100, 100000)
+        self.spin_log_lines.setSingleStep(100)
+        layout.addRow("Log Lines Shown:", self.spin_log_lines)
+        
         # Statistics visibility
         self.chk_statistics = QCheckBox("Show statistics bar")
         layout.addRow("", self.chk_statistics)
@@ -94,11 +115,77 @@ class SettingsDialog(QDialog):
         widget = QWidget()
         layout = QFormLayout(widget)
         
-        # Thread count
+        # Worker count (cleaning runs in separate processes)
         self.spin_threads = QSpinBox()
-        self.spin_threads.setRange(1, 16)
+        self.spin_threads.setRange(1, max(16, os.cpu_count() or 1))
         self.spin_threads.setValue(4)
-        layout.addRow("Worker Threads:", self.spin_threads)
+        layout.addRow("Worker Processes:", self.spin_threads)
+        
+        # Scan mode
+        self.cmb_scan_mode = QComboBox()
+        self.cmb_scan_mode.addItem("Fast (sample pages)", 'fast')
+        self.cmb_scan_mode.addItem("Full (every page)", 'full')
+        self.cmb_scan_mode.setToolTip("Fast mode falls back to a full scan when the sample is inconclusive")
+        layout.addRow("Scan Mode:", self.cmb_scan_mode)
+        
+        self.spin_sample_pages = QSpinBox()
+        self.spin_sample_pages.setRange(3, 500)
+        layout.addRow("Pages Sampled:", self.spin_sample_pages)
+        
+        # Scan cache
+        self.chk_scan_cache = QCheckBox("Remember scan results of unchanged files")
+        layout.addRow("", self.chk_scan_cache)
+        self.chk_scan_cache_hash = QCheckBox("Also compare file contents")
+        self.chk_scan_cache_hash.setToolTip(
+            "Detects files rewritten with the same size and date (e.g. by sync tools).\n"
+            "Reads the start and end of every file when it is added."
+        )
+        self.chk_scan_cache.toggled.connect(self.chk_scan_cache_hash.setEnabled)
+        layout.addRow("", self.chk_scan_cache_hash)
+        
+        # Save strategy
+        self.cmb_save_strategy = QComboBox()
+        for label, key in self.SAVE_STRATEGY_ITEMS:
+            self.cmb_save_strategy.addItem(label, key)
+        self.cmb_save_strategy.setToolTip(
+            "Auto: append changes when only links/annotations are removed,\n"
+            "fully rebuild the file when watermark streams were rewritten."
+        )
+        layout.addRow("Save Strategy:", self.cmb_save_strategy)
+        
+        # Files with nothing to remove are never re-saved
+        self.cmb_unchanged_output = QComboBox()
+        for label, key in self.UNCHANGED_OUTPUT_ITEMS:
+            self.cmb_unchanged_output.addItem(label, key)
+        self.cmb_unchanged_output.setToolTip(
+            "What the output file is when nothing had to be removed.\n"
+            "A hard link is instant, but the output and the original are then the same file."
+        )
+        layout.addRow("Unchanged Files:", self.cmb_unchanged_output)
+        
+        # Memory-mapped input
+        self.chk_mmap_inputs = QCheckBox("Memory-map input files")
+        self.chk_mmap_inputs.setToolTip(
+            "Workers share the operating system's file cache instead of each\n"
+            "reading a private copy. Lowers memory use on very large PDFs.\n"
+            "Do not edit input files elsewhere while they are processed."
+        )
+        layout.addRow("", self.chk_mmap_inputs)
+        
+        # Per-file memory budget (pages are then processed in windows)
+        self.spin_memory_budget = QSpinBox()
+        self.spin_memory_budget.setRange(0, 65536)
+        self.spin_memory_budget.setSingleStep(256)
+        self.spin_memory_budget.setSuffix(" MB")
+        self.spin_memory_budget.setSpecialValueText("Unlimited")
+        self.spin_memory_budget.setToolTip(
+            "Memory each file may use while cleaning. Large documents are processed\n"
+            "in page windows to stay within it; a file that cannot is reported as failed."
+        )
+        if current_rss_bytes() is None:
+            self.spin_memory_budget.setEnabled(False)
+            self.spin_memory_budget.setToolTip("Not available: this system does not report process memory.")
+        layout.addRow("Memory Budget per File:", self.spin_memory_budget)
         
         # Log level
         self.cmb_log_level = QComboBox()
@@ -112,15 +199,28 @@ class SettingsDialog(QDialog):
         self.txt_output_template.setText(self.settings.get('output_template', 'cleaned_{original}'))
         self.chk_auto_scan.setChecked(True)
         self.chk_activity_log.setChecked(self.settings.get('activity_log_visible', True))
+        self.spin_log_lines.setValue(self.settings.get('activity_log_max_lines', 1000))
         self.chk_statistics.setChecked(self.settings.get('statistics_visible', True))
         self.spin_font_size.setValue(self.settings.get('font_size', 10))
         self.spin_threads.setValue(self.settings.get('thread_count', 4))
+        self.chk_scan_cache.setChecked(self.settings.get('scan_cache_enabled', True))
+        self.chk_scan_cache_hash.setChecked(self.settings.get('scan_cache_content_hash', False))
+        self.chk_scan_cache_hash.setEnabled(self.chk_scan_cache.isChecked())
+        self.cmb_scan_mode.setCurrentIndex(max(self.cmb_scan_mode.findData(self.settings.get('scan_mode', 'fast')), 0))
+        self.spin_sample_pages.setValue(self.settings.get('scan_sample_pages', 30))
         
         # Theme
         theme = self.settings.get('theme', 'light')
         theme_index = 0 if theme == 'light' else 1
         self.cmb_theme.setCurrentIndex(theme_index)
         
+        index = self.cmb_save_strategy.findData(self.settings.get('save_strategy', 'auto'))
+        self.cmb_save_strategy.setCurrentIndex(max(index, 0))
+        index = self.cmb_unchanged_output.findData(self.settings.get('unchanged_output', 'copy'))
+        self.cmb_unchanged_output.setCurrentIndex(max(index, 0))
+        self.chk_mmap_inputs.setChecked(self.settings.get('mmap_inputs', False))
+        self.spin_memory_budget.setValue(self.settings.get('memory_budget_mb', 0))
+        
         log_level = self.settings.get('log_level', 'INFO')
         index = self.cmb_log_level.findText(log_level)
         if index >= 0:
@@ -130,9 +230,18 @@ class SettingsDialog(QDialog):
         """Save settings and close"""
         self.settings.set('output_template', self.txt_output_template.text())
         self.settings.set('activity_log_visible', self.chk_activity_log.isChecked())
+        self.settings.set('activity_log_max_lines', self.spin_log_lines.value())
         self.settings.set('statistics_visible', self.chk_statistics.isChecked())
         self.settings.set('font_size', self.spin_font_size.value())
         self.settings.set('thread_count', self.spin_threads.value())
+        self.settings.set('scan_cache_enabled', self.chk_scan_cache.isChecked())
+        self.settings.set('scan_cache_content_hash', self.chk_scan_cache_hash.isChecked())
+        self.settings.set('scan_mode', self.cmb_scan_mode.currentData())
+        self.settings.set('scan_sample_pages', self.spin_sample_pages.value())
+        self.settings.set('save_strategy', self.cmb_save_strategy.currentData())
+        self.settings.set('unchanged_output', self.cmb_unchanged_output.currentData())
+        self.settings.set('mmap_inputs', self.chk_mmap_inputs.isChecked())
+        self.settings.set('memory_budget_mb', self.spin_memory_budget.value())
         self.settings.set('log_level', self.cmb_log_level.currentText())
         
         # Save theme
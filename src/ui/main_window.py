@@ -2,7 +2,7 @@ from PySide6.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
                                QPushButton, QLabel, QFileDialog, QProgressBar, 
                                QGroupBox, QCheckBox, QMenuBar, QMenu, QMessageBox,
                                QApplication)
-from PySide6.QtCore import Qt, QSize
+from PySide6.QtCore import Qt, QSize, QTimer
 from PySide6.QtGui import QAction, QKeySequence
 import sys
 import os
@@ -13,28 +13,23 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspa
 from src.ui.widgets.file_list import FileList
 from src.ui.widgets.activity_log import ActivityLog
 from src.ui.widgets.statistics_bar import StatisticsBar
-from src.ui.dialogs.about_dialog import AboutDialog
-from src.ui.dialogs.settings_dialog import SettingsDialog
-from src.core.file_manager import FileManager
-from src.core.cleaner import PDFCleaner
-from src.workers.clean_worker import CleanWorker
-from src.workers.scan_worker import ScanWorker
 from src.utils.settings import SettingsManager
+# Dialogs, workers and everything that pulls in fitz are imported on first use,
+# so the window paints before the PDF stack is loaded
 from src.models.enums import FileStatus
 
 class MainWindow(QMainWindow):
-    def __init__(self):
+    def __init__(self, settings_manager=None):
         super().__init__()
         self.setWindowTitle("WaterMarkEraser - Professional PDF Cleaner")
         self.setMinimumSize(1000, 700)
         
-        # Managers
-        self.file_manager = FileManager()
-        self.cleaner = PDFCleaner()
-        self.settings_manager = SettingsManager()
+        # Managers (main() passes the one it already loaded)
+        self.settings_manager = settings_manager or SettingsManager()
         
-        # Workers list
-        self.scan_workers = []
+        # One shared scanner and one ingestion thread for every drop, started on first use
+        self.scan_scheduler = None
+        self.ingest_worker = None
         
         self.setup_ui()
         self.create_menu_bar()
@@ -56,6 +51,14 @@ class MainWindow(QMainWindow):
         # 3. File List Area
         self.file_list = FileList()
         self.file_list.files_dropped.connect(self.process_dropped_files)
+        self.file_list.details_requested.connect(self.request_scan_details)
+        
+        # Counters change per file; the bar is repainted at most 4 times a second
+        self.statistics_timer = QTimer(self)
+        self.statistics_timer.setSingleShot(True)
+        self.statistics_timer.setInterval(250)
+        self.statistics_timer.timeout.connect(self.update_statistics)
+        self.file_list.file_model.statistics_changed.connect(self.schedule_statistics_update)
         
         # 4. Bottom Controls
         controls = self.create_controls()
@@ -240,45 +243,92 @@ class MainWindow(QMainWindow):
             self.activity_log.info(f"Scanning folder: {folder}")
 
     def process_dropped_files(self, paths):
-        """Process list of file paths (files or folders) and add to list"""
-        pdf_files = self.file_manager.resolve_paths(paths)
-        files_to_scan = []
-        
-        for pdf_path in pdf_files:
-            info = self.file_manager.get_file_info(pdf_path)
-            if info:
-                self.file_list.add_file_item(info)
-                row_idx = self.file_list.rowCount() - 1
-                files_to_scan.append({'path': pdf_path, 'row': row_idx})
-                self.file_list.update_status(row_idx, "⏳", "Waiting to scan...")
-        
-        if files_to_scan:
-            self.start_scanning(files_to_scan)
-        
-        self.update_statistics()
-        self.statusBar().showMessage(f"Added {len(pdf_files)} files")
+        """Resolve file paths (files or folders) in the background and add them to the list"""
+        if self.ingest_worker is None:
+            self.ensure_scan_scheduler()
+            from src.workers.ingest_worker import IngestWorker
+            self.ingest_worker = IngestWorker(self.scan_scheduler)
+            self.ingest_worker.files_found.connect(self.on_files_found)
+            self.ingest_worker.ingest_finished.connect(self.on_ingest_finished)
+            self.ingest_worker.start()
+        
+        self.ingest_worker.add_paths(paths)
+        self.statusBar().showMessage("Adding files...")
+
+    def on_files_found(self, infos, priority, generation):
+        """Adds a batch of found files to the list and queues them for scanning"""
+        if generation != self.ingest_worker.generation:
+            return # List was cleared meanwhile
+        
+        # New rows start out queued
+        first_row = self.file_list.add_file_items(infos)
+        files_to_scan = [{'path': info['path'], 'row': first_row + offset} for offset, info in enumerate(infos)]
+        
+        self.start_scanning(files_to_scan, priority)
+
+    def on_ingest_finished(self, count, generation):
+        if generation == self.ingest_worker.generation:
+            self.statusBar().showMessage(f"Added {count} files")
+
+    def start_scanning(self, files_data, priority=None):
+        """Queues the given files on the shared background scanner"""
+        self.ensure_scan_scheduler()
+        if priority is None:
+            priority = self.scan_scheduler.PRIORITY_NORMAL
+        self.scan_scheduler.submit(files_data, priority)
+
+    def ensure_scan_scheduler(self):
+        if self.scan_scheduler is None:
+            from src.core.scan_cache import ScanCache
+            from src.workers.scan_scheduler import ScanScheduler
+            cache = None
+            if self.settings_manager.get('scan_cache_enabled', True):
+                try:
+                    cache = ScanCache(
+                        self.settings_manager.config_path / 'scan_cache.sqlite3',
+                        use_content_hash=self.settings_manager.get('scan_cache_content_hash', False)
+                    )
+                except Exception as e:
+                    self.activity_log.warning(f"Scan cache unavailable: {e}")
+            self.scan_scheduler = ScanScheduler(
+                self.settings_manager.get('thread_count', 4), cache=cache,
+                scan_mode=self.settings_manager.get('scan_mode', 'fast'),
+                sample_pages=self.settings_manager.get('scan_sample_pages', 30),
+                # The status icon only needs clean/marked; details are fetched on hover
+                detail='verdict',
+                use_mmap=self.settings_manager.get('mmap_inputs', False)
+            )
+            self.scan_scheduler.files_scanned.connect(self.on_files_scanned)
+            self.scan_scheduler.idle.connect(self.on_scan_idle)
+            self.scan_scheduler.start()
 
-    def start_scanning(self, files_data):
-        """Starts the background scanner for the given files"""
-        worker = ScanWorker(files_data)
-        worker.file_scanned.connect(self.on_file_scanned)
-        worker.finished.connect(lambda: self.cleanup_worker(worker))
-        worker.start()
-        
-        if not hasattr(self, 'scan_workers'):
-            self.scan_workers = []
-        self.scan_workers.append(worker)
+    def request_scan_details(self, row):
+        """Rescans a file with every detector (its status tooltip was opened)"""
+        path = self.file_list.get_path(row)
+        if path:
+            self.ensure_scan_scheduler()
+            self.scan_scheduler.submit([{'path': path, 'row': row}], self.scan_scheduler.PRIORITY_HIGH, detail='full')
 
-    def cleanup_worker(self, worker):
-        if hasattr(self, 'scan_workers') and worker in self.scan_workers:
-            self.scan_workers.remove(worker)
+    def on_scan_idle(self):
+        # Show the last results before announcing completion
+        self.scan_scheduler.bridge.deliver()
+        self.statusBar().showMessage("Scanning completed")
+
+    def on_files_scanned(self, batch):
+        for row, result in batch:
+            self.on_file_scanned(row, result)
 
     def on_file_scanned(self, row, result):
         if 'error' in result:
-             self.file_list.update_status(row, "❌", f"Error: {result['error']}")
+             self.file_list.update_status(row, FileStatus.ERROR, f"Error: {result['error']}")
              self.activity_log.error(f"Scan error on row {row+1}: {result['error']}")
              return
 
+        # The scan parses the file anyway, so it supplies the page count
+        if result.get('pages') is not None:
+            self.file_list.update_pages(row, result['pages'])
+        
+        producer = result.get('producer')
         links = result.get('links', 0)
         patterns = len(result.get('text_patterns', []))
         images = result.get('images', 0)
@@ -288,15 +338,24 @@ class MainWindow(QMainWindow):
         if patterns > 0: tooltip_parts.append(f"{patterns} text patterns")
         if images > 0: tooltip_parts.append(f"{images} recurring images")
         
-        if not tooltip_parts:
-            status = "✓"
+        # Verdict-only scans stop at the first finding
+        complete = result.get('complete', True)
+        if result.get('verdict', 'marked' if tooltip_parts else 'clean') == 'clean':
+            status = FileStatus.CLEAN
             tooltip = "Clean (No watermarks detected)"
         else:
-            status = "⚠️"
+            status = FileStatus.MARKED
             tooltip = "Found: " + ", ".join(tooltip_parts)
+            if not complete:
+                tooltip += "\n(loading full details...)"
+        
+        if producer:
+            tooltip += f"\nCreated with {producer}"
+        if result.get('mode') == 'fast':
+            tooltip += (f"\n(sampled {result.get('sampled_pages', 0)} of {result.get('pages', 0)} pages,"
+                        f" confidence {result.get('confidence', 0):.0%})")
             
-        self.file_list.update_status(row, status, tooltip)
-        self.update_statistics()
+        self.file_list.update_status(row, status, tooltip, needs_details=not complete)
 
     def start_cleaning(self):
         files = self.file_list.get_files()
@@ -337,7 +396,11 @@ class MainWindow(QMainWindow):
             'remove_links': self.chk_remove_links.isChecked(),
             'remove_annotations': self.chk_remove_annotations.isChecked(),
             'remove_watermarks': self.chk_remove_watermarks.isChecked(),
-            'overwrite_original': self.chk_overwrite.isChecked()
+            'overwrite_original': self.chk_overwrite.isChecked(),
+            'save_strategy': self.settings_manager.get('save_strategy', 'auto'),
+            'unchanged_output': self.settings_manager.get('unchanged_output', 'copy'),
+            'use_mmap': self.settings_manager.get('mmap_inputs', False),
+            'memory_budget_mb': self.settings_manager.get('memory_budget_mb', 0)
         }
         
         # Save options (except overwrite - too dangerous to save as default)
@@ -346,9 +409,10 @@ class MainWindow(QMainWindow):
         self.settings_manager.set('remove_watermarks', options['remove_watermarks'])
         
         # Start Worker
-        self.worker = CleanWorker(files_to_process, options)
-        self.worker.progress.connect(self.on_progress)
-        self.worker.file_finished.connect(self.on_file_finished)
+        from src.workers.clean_worker import CleanWorker
+        self.worker = CleanWorker(files_to_process, options,
+                                  max_workers=self.settings_manager.get('thread_count', 4))
+        self.worker.files_finished.connect(self.on_files_finished)
         self.worker.finished.connect(self.on_finished)
         self.worker.start()
         
@@ -361,13 +425,18 @@ class MainWindow(QMainWindow):
         self.progress_bar.setValue(current)
         self.lbl_progress.setText(f"Processing: {current}/{total} files")
 
+    def on_files_finished(self, batch):
+        for row, success, message, _ in batch:
+            self.on_file_finished(row, success, message)
+        # One progress update per batch
+        self.on_progress(batch[-1][3], self.progress_bar.maximum())
+
     def on_file_finished(self, row, success, message):
-        status = "✅" if success else "❌"
+        status = FileStatus.DONE if success else FileStatus.ERROR
         self.file_list.update_status(row, status, message)
         
         # Get file name for logging
-        name_item = self.file_list.item(row, 2)
-        file_name = name_item.text() if name_item else f"File {row+1}"
+        file_name = self.file_list.get_name(row) or f"File {row+1}"
         
         if success:
             self.activity_log.success(f"{file_name}: {message}")
@@ -375,6 +444,8 @@ class MainWindow(QMainWindow):
             self.activity_log.error(f"{file_name}: {message}")
 
     def on_finished(self):
+        # Deliver results still waiting for the next frame
+        self.worker.bridge.deliver()
         self.btn_start.setEnabled(True)
         self.btn_add_files.setEnabled(True)
         self.btn_add_folder.setEnabled(True)
@@ -382,7 +453,6 @@ class MainWindow(QMainWindow):
         self.lbl_progress.setVisible(False)
         self.statusBar().showMessage("Cleaning completed")
         self.activity_log.success("All files processed!")
-        self.update_statistics()
 
     def clear_list(self):
         """Clear all files from the list"""
@@ -393,76 +463,48 @@ class MainWindow(QMainWindow):
                 QMessageBox.Yes | QMessageBox.No
             )
             if reply == QMessageBox.Yes:
-                self.file_list.setRowCount(0)
-                self.update_statistics()
+                # Pending ingestion and scans refer to rows that are about to disappear
+                if self.ingest_worker:
+                    self.ingest_worker.cancel()
+                if self.scan_scheduler:
+                    self.scan_scheduler.clear()
+                self.file_list.clear_files()
                 self.activity_log.info("File list cleared")
     
     def select_all_files(self):
         """Select all files in the list"""
-        for row in range(self.file_list.rowCount()):
-            chk_item = self.file_list.item(row, 0)
-            if chk_item:
-                chk_item.setCheckState(Qt.Checked)
-        self.update_statistics()
+        self.file_list.set_all_checked(True)
     
     def deselect_all_files(self):
         """Deselect all files in the list"""
-        for row in range(self.file_list.rowCount()):
-            chk_item = self.file_list.item(row, 0)
-            if chk_item:
-                chk_item.setCheckState(Qt.Unchecked)
-        self.update_statistics()
+        self.file_list.set_all_checked(False)
+    
+    def schedule_statistics_update(self):
+        # Not restarted while running, so a steady stream of changes still repaints
+        if not self.statistics_timer.isActive():
+            self.statistics_timer.start()
     
     def update_statistics(self):
-        """Update the statistics bar"""
-        total = self.file_list.rowCount()
-        selected = 0
-        clean = 0
-        marked = 0
-        errors = 0
-        total_size = 0
-        
-        for row in range(total):
-            # Count selected
-            chk_item = self.file_list.item(row, 0)
-            if chk_item and chk_item.checkState() == Qt.Checked:
-                selected += 1
-            
-            # Count by status
-            status_item = self.file_list.item(row, 1)
-            if status_item:
-                status = status_item.text()
-                if status == "✓":
-                    clean += 1
-                elif status == "⚠️":
-                    marked += 1
-                elif status == "❌":
-                    errors += 1
-            
-            # Sum size
-            name_item = self.file_list.item(row, 2)
-            if name_item:
-                file_data = name_item.data(Qt.UserRole)
-                if file_data:
-                    total_size += file_data.get('size', 0)
-        
-        self.statistics_bar.update_stats(total, total_size, selected, clean, marked, errors)
+        """Update the statistics bar from the running counters"""
+        self.statistics_bar.update_stats(**self.file_list.file_model.statistics.as_dict())
     
     def show_settings(self):
         """Show settings dialog"""
+        from src.ui.dialogs.settings_dialog import SettingsDialog
         dialog = SettingsDialog(self.settings_manager, self)
         if dialog.exec():
             self.activity_log.info("Settings saved")
             # Reapply theme
             from src.ui.styles.styles import apply_stylesheet
             theme = self.settings_manager.get('theme', 'light')
-            apply_stylesheet(QApplication.instance(), theme)
-            self.activity_log.info(f"Theme changed to: {theme}")
+            if apply_stylesheet(QApplication.instance(), theme):
+                self.activity_log.info(f"Theme changed to: {theme}")
             # Apply other settings
             self.load_settings()
     
     def show_about(self):
         """Show about dialog"""
+        from src.ui.dialogs.about_dialog import AboutDialog
         dialog = AboutDialog(self)
         dialog.exec()
     
@@ -479,16 +521,26 @@ class MainWindow(QMainWindow):
         # Apply visibility settings
         activity_visible = self.settings_manager.get('activity_log_visible', True)
         self.activity_log.setVisible(activity_visible)
+        self.activity_log.set_max_lines(self.settings_manager.get('activity_log_max_lines', 1000))
         
         stats_visible = self.settings_manager.get('statistics_visible', True)
         self.statistics_bar.setVisible(stats_visible)
-        
-        # Apply theme
-        from src.ui.styles.styles import apply_stylesheet
-        theme = self.settings_manager.get('theme', 'light')
-        apply_stylesheet(QApplication.instance(), theme)
+        # The theme is applied by main() at startup and by show_settings on change
     
     def closeEvent(self, event):
         """Save settings on close"""
         self.settings_manager.set('window_geometry', self.saveGeometry())
+        
+        if self.ingest_worker:
+            self.ingest_worker.stop()
+            self.ingest_worker.wait()
+        if self.scan_scheduler:
+            self.scan_scheduler.stop()
+            self.scan_scheduler.wait()
+        
+        # Let running jobs finish so no worker process is orphaned mid-write
+        worker = getattr(self, 'worker', None)
+        if worker and worker.isRunning():
+            worker.stop()
+            worker.wait()
         event.accept()
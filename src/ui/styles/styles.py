@@ -54,10 +54,20 @@ def set_theme(theme_name: str):
     else:
         current_theme = LIGHT_THEME
 
+# Built stylesheets by theme name - each is only formatted once
+_stylesheet_cache = {}
+
 def get_stylesheet() -> str:
     """Returns the complete QSS stylesheet for current theme"""
-    c = current_theme  # Shorthand
-    
+    theme_name = get_current_theme_name()
+    stylesheet = _stylesheet_cache.get(theme_name)
+    if stylesheet is None:
+        stylesheet = _build_stylesheet(current_theme)
+        _stylesheet_cache[theme_name] = stylesheet
+    return stylesheet
+
+def _build_stylesheet(c) -> str:
+    """Formats the QSS for a theme's colors"""
     return f"""
     /* Main Window */
     QMainWindow {{
@@ -420,9 +430,16 @@ def get_stylesheet() -> str:
     """
 
 def apply_stylesheet(app, theme='light'):
-    """Apply the stylesheet to the application"""
+    """
+    Apply the stylesheet to the application.
+    Returns False when it was already applied (re-setting it would restyle every widget).
+    """
     set_theme(theme)
-    app.setStyleSheet(get_stylesheet())
+    stylesheet = get_stylesheet()
+    if app.styleSheet() == stylesheet:
+        return False
+    app.setStyleSheet(stylesheet)
+    return True
 
 def get_current_theme_name():
     """Get the name of the current theme"""
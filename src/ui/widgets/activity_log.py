@@ -1,19 +1,38 @@
-from PySide6.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QTextEdit, QPushButton, QLabel
-from PySide6.QtCore import Qt, Signal
-from PySide6.QtGui import QTextCursor, QColor
+from PySide6.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QPlainTextEdit, QPushButton, QLabel
+from PySide6.QtCore import Qt, Signal, QTimer
+from collections import deque
 from datetime import datetime
+from html import escape
 import sys
 import os
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 from src.models.enums import LogLevel, LOG_COLORS, LOG_PREFIXES
+from src.utils.logger import logger
 
 class ActivityLog(QWidget):
-    """Activity log widget with color-coded, timestamped messages"""
+    """
+    Activity log widget with color-coded, timestamped messages.
+    Only the last max_lines messages are kept on screen; every message also
+    goes to the log file, which holds the full history (only warnings and
+    errors are echoed to the console).
+    """
     
-    def __init__(self, parent=None):
+    DEFAULT_MAX_LINES = 1000
+    FLUSH_INTERVAL_MS = 100
+    
+    def __init__(self, parent=None, max_lines=DEFAULT_MAX_LINES):
         super().__init__(parent)
         self.auto_scroll = True
+        # Formatted lines waiting for the next flush; older ones would scroll off anyway
+        self.pending = deque(maxlen=max_lines)
         self.setup_ui()
+        self.set_max_lines(max_lines)
+        
+        self.flush_timer = QTimer(self)
+        self.flush_timer.setSingleShot(True)
+        self.flush_timer.setInterval(self.FLUSH_INTERVAL_MS)
+        self.flush_timer.timeout.connect(self.flush)
+        self._flush_pending = False
         
     def setup_ui(self):
         layout = QVBoxLayout(self)
@@ -39,31 +58,55 @@ class ActivityLog(QWidget):
         header.addWidget(self.btn_auto_scroll)
         header.addWidget(self.btn_clear)
         
-        # Text area
-        self.text_edit = QTextEdit()
+        # Text area (plain text edit: cheap appends, old blocks dropped)
+        self.text_edit = QPlainTextEdit()
         self.text_edit.setReadOnly(True)
         self.text_edit.setMaximumHeight(200)
         
         layout.addLayout(header)
         layout.addWidget(self.text_edit)
         
+    def set_max_lines(self, max_lines):
+        """Number of messages kept on screen"""
+        max_lines = max(1, max_lines)
+        self.text_edit.setMaximumBlockCount(max_lines)
+        self.pending = deque(self.pending, maxlen=max_lines)
+    
     def log(self, level: LogLevel, message: str):
         """Add a log message"""
+        # Full history goes to the log file
+        getattr(logger, level.name.lower(), logger.info)(message)
+        
         timestamp = datetime.now().strftime("%H:%M:%S")
         prefix = LOG_PREFIXES.get(level, "")
         color = LOG_COLORS.get(level, "#000000")
         
         # Format message
-        formatted = f'<span style="color: {color};">[{timestamp}] {prefix} {message}</span>'
+        formatted = f'<span style="color: {color};">[{timestamp}] {prefix} {escape(message)}</span>'
+        
+        # Rendered with the next batch
+        self.pending.append(formatted)
+        if not self._flush_pending:
+            self._flush_pending = True
+            self.flush_timer.start()
+    
+    def flush(self):
+        """Renders pending messages in one batch"""
+        self._flush_pending = False
+        if not self.pending:
+            return
         
-        # Append to log
-        self.text_edit.append(formatted)
+        scroll_bar = self.text_edit.verticalScrollBar()
+        position = scroll_bar.value()
+        self.text_edit.setUpdatesEnabled(False)
+        try:
+            while self.pending:
+                self.text_edit.appendHtml(self.pending.popleft())
+        finally:
+            self.text_edit.setUpdatesEnabled(True)
         
         # Auto-scroll
-        if self.auto_scroll:
-            cursor = self.text_edit.textCursor()
-            cursor.movePosition(QTextCursor.End)
-            self.text_edit.setTextCursor(cursor)
+        scroll_bar.setValue(scroll_bar.maximum() if self.auto_scroll else position)
     
     def info(self, message: str):
         self.log(LogLevel.INFO, message)
@@ -86,5 +129,6 @@ class ActivityLog(QWidget):
         self.btn_auto_scroll.setText(f"Auto-scroll: {status}")
     
     def clear(self):
+        self.pending.clear()
         self.text_edit.clear()
         self.info("Log cleared")
@@ -1,22 +1,25 @@
-from PySide6.QtWidgets import (QTableWidget, QTableWidgetItem, QHeaderView, 
-                               QWidget, QHBoxLayout, QPushButton, QAbstractItemView)
-from PySide6.QtCore import Qt, Signal
-from PySide6.QtGui import QIcon
+from PySide6.QtWidgets import QTableView, QHeaderView, QAbstractItemView
+from PySide6.QtCore import Qt, Signal, QEvent
+from src.models.file_list_model import FileListModel
 
-class FileList(QTableWidget):
+class FileList(QTableView):
     """
     Widget to display the list of PDF files to be processed.
+    Rows are served by a FileListModel, so only visible cells are ever painted.
     """
     files_dropped = Signal(list)
+    details_requested = Signal(int) # row whose status tooltip needs a full-detail scan
     
     def __init__(self, parent=None):
         super().__init__(parent)
-        self.setColumnCount(5)
-        self.setHorizontalHeaderLabels(["✓", "Status", "Name", "Pages", "Size"])
-        self.setSelectionBehavior(QTableWidget.SelectRows)
+        self.file_model = FileListModel(self)
+        self.setModel(self.file_model)
+        self.setSelectionBehavior(QAbstractItemView.SelectRows)
         self.setAlternatingRowColors(True)
         self.horizontalHeader().setStretchLastSection(False)
         self.horizontalHeader().setSectionResizeMode(2, QHeaderView.Stretch)
+        # Uniform row heights: no per-row size hints to compute while scrolling
+        self.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
         self.setColumnWidth(0, 40)
         self.setColumnWidth(1, 60)
         self.setColumnWidth(3, 80)
@@ -26,52 +29,31 @@ class FileList(QTableWidget):
         self.setAcceptDrops(True)
         
         # Connect double-click to open file
-        self.itemDoubleClicked.connect(self.on_item_double_clicked)
+        self.doubleClicked.connect(self.on_item_double_clicked)
 
     def add_file_item(self, file_data):
         """
         Adds a file to the list.
         file_data: dict containing 'name', 'path', 'pages', 'size'
         """
-        row = self.rowCount()
-        self.insertRow(row)
-        
-        # 0. Checkbox
-        chk_item = QTableWidgetItem()
-        chk_item.setFlags(Qt.ItemIsUserCheckable | Qt.ItemIsEnabled)
-        chk_item.setCheckState(Qt.Checked)
-        self.setItem(row, 0, chk_item)
-        
-        # 1. Status Icon
-        status_item = QTableWidgetItem("QUE")  # Default to queued
-        status_item.setTextAlignment(Qt.AlignCenter)
-        self.setItem(row, 1, status_item)
-        
-        # 2. Name
-        name_item = QTableWidgetItem(file_data.get('name', 'Unknown'))
-        name_item.setToolTip(file_data.get('path', ''))
-        # Store full file data in the name item for easy access
-        name_item.setData(Qt.UserRole, file_data) 
-        self.setItem(row, 2, name_item)
-        
-        # 3. Pages
-        pages_item = QTableWidgetItem(str(file_data.get('pages', '-')))
-        pages_item.setTextAlignment(Qt.AlignCenter)
-        self.setItem(row, 3, pages_item)
-        
-        # 4. Size
-        size_str = self._format_size(file_data.get('size', 0))
-        size_item = QTableWidgetItem(size_str)
-        size_item.setTextAlignment(Qt.AlignCenter)
-        self.setItem(row, 4, size_item)
+        self.file_model.add_files([file_data])
+
+    def add_file_items(self, files_data):
+        """
+        Adds a batch of files with a single row insertion and repaint.
+        Returns the row index of the first added file.
+        """
+        return self.file_model.add_files(files_data)
+
+    def rowCount(self):
+        return self.file_model.rowCount()
+
+    def clear_files(self):
+        self.file_model.clear()
+
+    def set_all_checked(self, checked):
+        self.file_model.set_all_checked(checked)
 
-    def _format_size(self, size_bytes):
-        for unit in ['B', 'KB', 'MB', 'GB']:
-            if size_bytes < 1024:
-                return f"{size_bytes:.1f} {unit}"
-            size_bytes /= 1024
-        return f"{size_bytes:.1f} TB"
-        
     def dragEnterEvent(self, event):
         if event.mimeData().hasUrls():
             event.accept()
@@ -97,59 +79,59 @@ class FileList(QTableWidget):
         """
         Returns a list of dicts for all files in the table.
         """
-        files = []
-        for row in range(self.rowCount()):
-            # Get file data from name item
-            name_item = self.item(row, 2)
-            if not name_item:
-                continue
-                
-            file_data = name_item.data(Qt.UserRole)
-            if not file_data:
-                continue
-            
-            # Checkbox state
-            chk_item = self.item(row, 0)
-            checked = chk_item.checkState() == Qt.Checked if chk_item else False
-            
-            files.append({
-                'path': file_data.get('path', ''),
-                'checked': checked,
-                'row': row
-            })
-        
-        return files
+        model = self.file_model
+        return [
+            {'path': model.path(row), 'checked': model.is_checked(row), 'row': row}
+            for row in range(model.rowCount())
+        ]
 
-    def update_status(self, row, status, tooltip=""):
+    def update_status(self, row, status, tooltip="", needs_details=False):
         """
         Updates the status column for a specific row.
+        status: FileStatus
+        needs_details: the tooltip is partial; hovering it emits details_requested.
         """
-        item = self.item(row, 1)
-        if item:
-            item.setText(status)
-            item.setToolTip(tooltip)
+        self.file_model.set_status(row, status, tooltip, needs_details)
+    
+    def get_path(self, row):
+        """Path of the file in a row, or None"""
+        return self.file_model.path(row)
+    
+    def get_name(self, row):
+        """Display name of the file in a row, or None"""
+        return self.file_model.name(row)
     
-    def on_item_double_clicked(self, item):
+    def viewportEvent(self, event):
+        # Full scan details are only fetched when someone looks at them
+        if event.type() == QEvent.ToolTip:
+            index = self.indexAt(event.pos())
+            if (index.column() == FileListModel.COL_STATUS
+                    and self.file_model.take_details_request(index.row())):
+                self.details_requested.emit(index.row())
+        return super().viewportEvent(event)
+    
+    def update_pages(self, row, pages):
+        """
+        Fills in the page count once it is known.
+        """
+        self.file_model.set_pages(row, pages)
+    
+    def on_item_double_clicked(self, index):
         """Open the PDF file when double-clicked"""
-        row = item.row()
-        name_item = self.item(row, 2)
+        file_path = self.file_model.path(index.row())
         
-        if name_item:
-            file_data = name_item.data(Qt.UserRole)
-            if file_data and 'path' in file_data:
-                file_path = file_data['path']
-                
-                # Open file with default PDF viewer
-                import os
-                import platform
-                import subprocess
-                
-                try:
-                    if platform.system() == 'Windows':
-                        os.startfile(file_path)
-                    elif platform.system() == 'Darwin':  # macOS
-                        subprocess.run(['open', file_path])
-                    else:  # Linux
-                        subprocess.run(['xdg-open', file_path])
-                except Exception as e:
-                    print(f"Error opening file: {e}")
+        if file_path:
+            # Open file with default PDF viewer
+            import os
+            import platform
+            import subprocess
+            
+            try:
+                if platform.system() == 'Windows':
+                    os.startfile(file_path)
+                elif platform.system() == 'Darwin':  # macOS
+                    subprocess.run(['open', file_path])
+                else:  # Linux
+                    subprocess.run(['xdg-open', file_path])
+            except Exception as e:
+                print(f"Error opening file: {e}")
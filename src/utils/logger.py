@@ -5,9 +5,13 @@ from datetime import datetime
 from src.models.enums import LogLevel
 
 class AppLogger:
-    """Centralized application logger"""
+    """
+    Centralized application logger.
+    The log file gets every message; the console only console_level and above,
+    so the activity log's routine lines do not flood stdout.
+    """
     
-    def __init__(self, name: str = "PDFCleaner", log_dir: Path = None):
+    def __init__(self, name: str = "PDFCleaner", log_dir: Path = None, console_level: int = logging.WARNING):
         self.logger = logging.getLogger(name)
         self.logger.setLevel(logging.DEBUG)
         
@@ -23,7 +27,7 @@ class AppLogger:
         
         # Console handler
         console_handler = logging.StreamHandler(sys.stdout)
-        console_handler.setLevel(logging.INFO)
+        console_handler.setLevel(console_level)
         
         # Formatter
         formatter = logging.Formatter(
@@ -15,10 +15,19 @@ class SettingsManager:
         'output_template': 'cleaned_{original}',
         'save_location': 'same_dir',
         'activity_log_visible': True,
+        'activity_log_max_lines': 1000,
         'statistics_visible': True,
         'theme': 'light',
         'font_size': 10,
         'thread_count': 4,
+        'scan_cache_enabled': True,
+        'scan_cache_content_hash': False,
+        'scan_mode': 'fast',
+        'scan_sample_pages': 30,
+        'save_strategy': 'auto',
+        'unchanged_output': 'copy',
+        'mmap_inputs': False,
+        'memory_budget_mb': 0,
         'log_level': 'INFO'
     }
     
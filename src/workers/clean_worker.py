@@ -1,33 +1,27 @@
 from PySide6.QtCore import QThread, Signal
-from src.core.cleaner import PDFCleaner
+from src.core.clean_engine import CleanEngine
+from src.workers.result_bridge import ResultBridge
 
 class CleanWorker(QThread):
-    progress = Signal(int, int) # item_idx, total
-    file_finished = Signal(int, bool, str) # row_idx, success, message
-    finished = Signal()
+    # [(row_idx, success, message, completed)], delivered once per frame
+    files_finished = Signal(list)
     
-    def __init__(self, files, options=None):
+    def __init__(self, files, options=None, max_workers=None):
         super().__init__()
         self.files = files # List of dicts: {'path': str, 'row': int}
         self.options = options
-        self.cleaner = PDFCleaner()
-        self._is_running = True
+        self.engine = CleanEngine(max_workers, options)
+        # Created here, on the GUI thread, so its frame timer runs there
+        self.bridge = ResultBridge()
+        self.bridge.batch_ready.connect(self.files_finished)
 
     def run(self):
-        total = len(self.files)
-        for i, file_data in enumerate(self.files):
-            if not self._is_running:
-                break
-            
-            input_path = file_data['path']
+        completed = 0
+        
+        # Results arrive in completion order, so progress counts finished jobs
+        for file_data, result in self.engine.run(self.files):
             row = file_data['row']
             
-            # Generate output path
-            output_path = self.cleaner.generate_output_path(input_path)
-            
-            # Run cleaning
-            result = self.cleaner.clean_document(input_path, output_path, self.options)
-            
             # Emit result
             if result['success']:
                 parts = []
@@ -39,17 +33,18 @@ class CleanWorker(QThread):
                     parts.append(f"{result['watermarks_removed']} watermarks")
                 
                 msg = f"Removed: {', '.join(parts)}" if parts else "No changes needed"
-                self.file_finished.emit(row, True, msg)
+                success = True
             else:
                 error_msg = result.get('error', 'Unknown error')
                 # Show traceback in tooltip if available
                 if 'traceback' in result:
                     error_msg = f"{error_msg}\n\nDetails:\n{result['traceback']}"
-                self.file_finished.emit(row, False, error_msg)
-            
-            self.progress.emit(i + 1, total)
+                msg = error_msg
+                success = False
             
-        self.finished.emit()
+            completed += 1
+            self.bridge.post((row, success, msg, completed))
+        # Receivers drain the bridge on QThread.finished, so no result trails it
 
     def stop(self):
-        self._is_running = False
+        self.engine.cancel()
@@ -0,0 +1,95 @@
+import os
+import queue
+import time
+
+from PySide6.QtCore import QThread, Signal
+from src.core.file_manager import FileManager
+from src.workers.scan_scheduler import ScanScheduler
+
+class IngestWorker(QThread):
+    """
+    Resolves dropped files/folders off the GUI thread.
+    Found PDFs are delivered in small batches as the walk progresses, so rows
+    appear (and get scanned) while a large folder is still being crawled.
+    """
+    files_found = Signal(list, int, int) # infos, scan priority, generation
+    ingest_finished = Signal(int, int) # files found, generation
+    
+    BATCH_SIZE = 200
+    BATCH_INTERVAL = 0.1 # seconds
+    
+    def __init__(self, scan_scheduler=None):
+        super().__init__()
+        self.file_manager = FileManager()
+        self.scan_scheduler = scan_scheduler
+        self.generation = 0
+        self._requests = queue.Queue()
+        self._is_running = True
+
+    def add_paths(self, paths):
+        """Queues a drop (list of files and/or folders)"""
+        self._requests.put((list(paths), self.generation))
+
+    def cancel(self):
+        """Abandons queued and in-progress drops (e.g. when the list is cleared)"""
+        self.generation += 1
+
+    def run(self):
+        while self._is_running:
+            request = self._requests.get()
+            if request is None:
+                break
+            paths, generation = request
+            if generation == self.generation:
+                self._ingest(paths, generation)
+
+    def _ingest(self, paths, generation):
+        # Files picked one by one are scanned before the contents of dropped folders
+        files = [p for p in paths if os.path.isfile(p)]
+        folders = [p for p in paths if not os.path.isfile(p)]
+        
+        found = 0
+        seen = set()
+        for group, priority in ((files, ScanScheduler.PRIORITY_HIGH),
+                                (folders, ScanScheduler.PRIORITY_NORMAL)):
+            batch = []
+            last_flush = time.monotonic()
+            for path, size in self.file_manager.iter_pdf_files(group):
+                if not self._is_running or generation != self.generation:
+                    return
+                if path in seen:
+                    continue
+                seen.add(path)
+                
+                # Page count is filled in by the scan, which parses the file anyway
+                batch.append({
+                    'name': os.path.basename(path),
+                    'path': path,
+                    'pages': None,
+                    'size': size,
+                    'valid': True
+                })
+                found += 1
+                
+                if len(batch) >= self.BATCH_SIZE or time.monotonic() - last_flush >= self.BATCH_INTERVAL:
+                    self._flush(batch, priority, generation)
+                    batch = []
+                    last_flush = time.monotonic()
+            
+            if batch:
+                self._flush(batch, priority, generation)
+        
+        self.ingest_finished.emit(found, generation)
+
+    def _flush(self, batch, priority, generation):
+        # Back-pressure: do not run arbitrarily far ahead of the scanner
+        if self.scan_scheduler:
+            while (self._is_running and generation == self.generation
+                   and not self.scan_scheduler.wait_for_room(0.5)):
+                if not self.scan_scheduler.isRunning():
+                    break
+        self.files_found.emit(batch, priority, generation)
+
+    def stop(self):
+        self._is_running = False
+        self._requests.put(None)
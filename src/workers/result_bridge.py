@@ -0,0 +1,56 @@
+import threading
+from collections import deque
+
+from PySide6.QtCore import QObject, QTimer, Qt, Signal
+
+class ResultBridge(QObject):
+    """
+    Hands results from worker threads to the GUI thread in frames.
+    post() is thread-safe and never touches the event queue more than once
+    per frame; everything posted during a frame arrives as one batch_ready,
+    so GUI cost per file stays flat however fast the workers are.
+    Create it on the GUI thread.
+    """
+    batch_ready = Signal(list)
+    _wake = Signal()
+
+    FRAME_MS = 50
+
+    def __init__(self, parent=None, frame_ms=FRAME_MS):
+        super().__init__(parent)
+        self._items = deque()
+        self._lock = threading.Lock()
+        self._scheduled = False
+
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(frame_ms)
+        self._timer.timeout.connect(self.deliver)
+        # Always queued: post() may run on any thread
+        self._wake.connect(self._start_frame, Qt.QueuedConnection)
+
+    def post(self, item):
+        """Queues one result for the next frame (any thread)"""
+        with self._lock:
+            self._items.append(item)
+            if self._scheduled:
+                return
+            self._scheduled = True
+        self._wake.emit()
+
+    def deliver(self):
+        """Emits everything posted so far as one batch (GUI thread)"""
+        with self._lock:
+            items = list(self._items)
+            self._items.clear()
+            self._scheduled = False
+        if items:
+            self.batch_ready.emit(items)
+
+    def clear(self):
+        """Drops results not delivered yet"""
+        with self._lock:
+            self._items.clear()
+
+    def _start_frame(self):
+        self._timer.start()
@@ -0,0 +1,193 @@
+import heapq
+import itertools
+import threading
+from functools import partial
+
+from PySide6.QtCore import QThread, Signal
+from src.core.detector import WatermarkDetector, scan_job
+from src.core.process_pool import create_process_pool, resolve_worker_count
+from src.workers.result_bridge import ResultBridge
+
+class ScanScheduler(QThread):
+    """
+    Shared scanner for every file added to the list.
+    One priority queue feeds a bounded pool of worker processes, so scan
+    throughput follows the core count instead of the number of drops.
+    """
+    files_scanned = Signal(list) # [(row, result)], delivered once per frame
+    idle = Signal() # queue drained and no scan in flight
+    
+    PRIORITY_HIGH = 0
+    PRIORITY_NORMAL = 10
+    
+    def __init__(self, max_workers=None, max_queued=10000, cache=None,
+                 scan_mode='full', sample_pages=WatermarkDetector.DEFAULT_SAMPLE_PAGES, detail='full',
+                 use_mmap=False):
+        super().__init__()
+        self.max_workers = resolve_worker_count(max_workers)
+        self.cache = cache # Optional ScanCache
+        self.scan_mode = scan_mode
+        self.sample_pages = sample_pages
+        self.detail = detail # default detail level; 'verdict' or 'full'
+        self.use_mmap = use_mmap # workers map files instead of reading them
+        self.max_queued = max_queued
+        # Enough submitted work to keep every process busy, little enough
+        # that a high-priority request does not wait behind a long backlog
+        self._max_in_flight = self.max_workers * 2
+        
+        self._cond = threading.Condition()
+        self._heap = [] # (priority, seq, path)
+        self._seq = itertools.count()
+        self._entries = {} # path -> {'rows': [int], 'in_flight': bool, 'priority': int, 'detail': str}
+        self._queued = 0
+        self._in_flight = 0
+        self._is_running = True
+        
+        # Results are posted from pool threads and reach the GUI in batches
+        self.bridge = ResultBridge()
+        self.bridge.batch_ready.connect(self.files_scanned)
+
+    def submit(self, files, priority=PRIORITY_NORMAL, block=False, detail=None):
+        """
+        Queues files for scanning.
+        files: list of dicts {'path': str, 'row': int}
+        detail: 'verdict' or 'full' (default: the scheduler's detail level)
+        A path that is already queued or being scanned is not scanned twice;
+        the new row simply receives the same result.
+        With block=True the caller waits while the queue is full (back-pressure
+        for background producers). The GUI thread must use block=False.
+        Returns the number of newly queued paths.
+        """
+        detail = detail or self.detail
+        added = 0
+        with self._cond:
+            for file_data in files:
+                path = file_data['path']
+                entry = self._entries.get(path)
+                if entry is not None:
+                    entry['rows'].append(file_data['row'])
+                    if not entry['in_flight'] and detail == 'full':
+                        entry['detail'] = 'full'
+                    if not entry['in_flight'] and priority < entry['priority']:
+                        # Re-push with the better priority; the stale heap item is skipped
+                        entry['priority'] = priority
+                        heapq.heappush(self._heap, (priority, next(self._seq), path))
+                    continue
+                
+                while block and self._is_running and self._queued >= self.max_queued:
+                    self._cond.wait()
+                if not self._is_running:
+                    break
+                
+                self._entries[path] = {
+                    'rows': [file_data['row']], 'in_flight': False, 'priority': priority, 'detail': detail
+                }
+                heapq.heappush(self._heap, (priority, next(self._seq), path))
+                self._queued += 1
+                added += 1
+            self._cond.notify_all()
+        return added
+
+    def wait_for_room(self, timeout=None):
+        """Blocks until the queue is below its limit. Returns False on timeout or stop."""
+        with self._cond:
+            return self._cond.wait_for(
+                lambda: not self._is_running or self._queued < self.max_queued, timeout
+            ) and self._is_running
+
+    def clear(self):
+        """
+        Drops every queued scan (e.g. when the file list is cleared).
+        Scans already running finish, but their results are discarded.
+        """
+        with self._cond:
+            self._heap.clear()
+            self._queued = 0
+            for path in [p for p, e in self._entries.items() if not e['in_flight']]:
+                del self._entries[path]
+            for entry in self._entries.values():
+                entry['rows'] = []
+            self._cond.notify_all()
+        # Posted but undelivered results refer to rows that are gone too
+        self.bridge.clear()
+
+    def run(self):
+        executor = create_process_pool(self.max_workers)
+        try:
+            while True:
+                with self._cond:
+                    self._cond.wait_for(
+                        lambda: not self._is_running or (self._queued and self._in_flight < self._max_in_flight)
+                    )
+                    if not self._is_running:
+                        break
+                    
+                    path = self._pop_next()
+                    if path is None:
+                        continue
+                    detail = self._entries[path]['detail']
+                    self._in_flight += 1
+                    # Room in the queue again - wake blocked producers
+                    self._cond.notify_all()
+                
+                fingerprint = None
+                if self.cache:
+                    cached, fingerprint = self.cache.lookup(path)
+                    # A sampled result does not answer a request for a full scan,
+                    # nor a verdict-only result a request for full detail
+                    if (cached is not None
+                            and (self.scan_mode == 'fast' or cached.get('mode') == 'full')
+                            and (detail == 'verdict' or cached.get('complete'))):
+                        self._finish(path, cached)
+                        continue
+                
+                future = executor.submit(scan_job, path, self.scan_mode, self.sample_pages, detail,
+                                         self.use_mmap)
+                future.add_done_callback(partial(self._on_scan_done, path, fingerprint))
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+            if self.cache:
+                # Scans still running call store() later; a closed cache ignores them
+                self.cache.close()
+
+    def _pop_next(self):
+        """Pops the best queued path, skipping heap items made stale by re-prioritising"""
+        while self._heap:
+            priority, _, path = heapq.heappop(self._heap)
+            entry = self._entries.get(path)
+            if entry is None or entry['in_flight'] or entry['priority'] != priority:
+                continue
+            entry['in_flight'] = True
+            self._queued -= 1
+            return path
+        self._queued = 0
+        return None
+
+    def _on_scan_done(self, path, fingerprint, future):
+        # Runs on the executor's internal thread; the bridge carries results to the GUI thread
+        try:
+            result = future.result()
+        except Exception as e:
+            result = {'error': f"Worker process failed: {e}"}
+        
+        if self.cache:
+            self.cache.store(path, fingerprint, result)
+        self._finish(path, result)
+
+    def _finish(self, path, result):
+        with self._cond:
+            entry = self._entries.pop(path, None)
+            self._in_flight -= 1
+            is_idle = not self._queued and not self._in_flight
+            self._cond.notify_all()
+        
+        if entry:
+            for row in entry['rows']:
+                self.bridge.post((row, result))
+        if is_idle:
+            self.idle.emit()
+
+    def stop(self):
+        with self._cond:
+            self._is_running = False
+            self._cond.notify_all()
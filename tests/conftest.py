@@ -0,0 +1,31 @@
+import os
+import sys
+
+import fitz
+import pytest
+
+# The application is run from the repository root (python -m src.cli, src/main.py)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def make_pdf():
+    """
+    Builds an in-memory PDF: one entry per page, each a list of (x, y, text)
+    placements. Returns the open fitz.Document.
+    """
+    docs = []
+
+    def build(pages):
+        doc = fitz.open()
+        for placements in pages:
+            page = doc.new_page()
+            for x, y, text in placements:
+                page.insert_text((x, y), text)
+        doc = fitz.open(stream=doc.tobytes(), filetype='pdf')
+        docs.append(doc)
+        return doc
+
+    yield build
+    for doc in docs:
+        doc.close()
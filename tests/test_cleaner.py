@@ -0,0 +1,85 @@
+import fitz
+
+from src.core.cleaner import PDFCleaner
+
+
+def image_doc(pages, rect):
+    """Every page shows one shared grey image at rect (None: the whole page)"""
+    pixmap = fitz.Pixmap(fitz.csRGB, fitz.IRect(0, 0, 40, 20), False)
+    pixmap.clear_with(90)
+    doc = fitz.open()
+    xref = 0
+    for _ in range(pages):
+        page = doc.new_page()
+        xref = page.insert_image(rect or page.rect, pixmap=pixmap, xref=xref,
+                                 keep_proportion=False)
+    return doc.tobytes()
+
+
+def clean(data):
+    cleaned, result = PDFCleaner().clean_bytes(data, {'remove_watermarks': True})
+    assert result['success'], result.get('error')
+    with fitz.open(stream=cleaned, filetype='pdf') as doc:
+        sizes = [(image[2], image[3]) for page in doc for image in page.get_images()]
+    return result, sizes
+
+
+def test_top_left_logo_is_removed():
+    result, sizes = clean(image_doc(3, fitz.Rect(10, 10, 90, 50)))
+    assert result['watermarks_removed'] == 1
+    assert set(sizes) == {(1, 1)}
+
+
+def test_single_page_scan_is_kept():
+    result, sizes = clean(image_doc(1, None))
+    assert result['watermarks_removed'] == 0
+    assert sizes == [(40, 20)]
+
+
+def test_shared_full_page_background_is_kept():
+    result, sizes = clean(image_doc(3, None))
+    assert result['watermarks_removed'] == 0
+    assert set(sizes) == {(40, 20)}
+
+
+def test_logo_on_half_the_pages_or_fewer_is_kept():
+    # The scan only reports images on more than half of the pages
+    doc = fitz.open(stream=image_doc(2, fitz.Rect(10, 10, 90, 50)), filetype='pdf')
+    doc.new_page()
+    doc.new_page()
+    result, sizes = clean(doc.tobytes())
+    assert result['watermarks_removed'] == 0
+
+
+def test_unreadable_file_leaves_no_copy(tmp_path):
+    junk = tmp_path / 'junk.pdf'
+    junk.write_bytes(b'not a pdf')
+    cleaner = PDFCleaner()
+    for options, output in (({}, tmp_path / 'cleaned_junk.pdf'), ({'overwrite_original': True}, None)):
+        result = cleaner.clean_document(str(junk), output and str(output),
+                                        dict(options, save_strategy='incremental'))
+        assert not result['success']
+        assert str(junk) in result['error'] and '.tmp' not in result['error']
+    assert sorted(p.name for p in tmp_path.iterdir()) == ['junk.pdf']
+
+
+def test_shared_stream_is_cleaned_for_every_page_naming():
+    # Two pages share one content stream but call the same watermark form by different names
+    doc = fitz.open()
+    form = doc.get_new_xref()
+    doc.update_object(form, "<< /Type /XObject /Subtype /Form /BBox [0 0 50 50] >>")
+    doc.update_stream(form, b"0 0 50 50 re f")
+    contents = doc.get_new_xref()
+    doc.update_object(contents, "<< >>")
+    doc.update_stream(contents, b"q /A Do Q q /B Do Q 0 0 m 100 100 l S")
+    for name in ('A', 'B'):
+        page = doc.new_page()
+        doc.xref_set_key(page.xref, "Resources", f"<< /XObject << /{name} {form} 0 R >> >>")
+        doc.xref_set_key(page.xref, "Contents", f"{contents} 0 R")
+    
+    cleaned, result = PDFCleaner().clean_bytes(doc.tobytes(), {'remove_watermarks': True})
+    assert result['watermarks_removed'] == 2
+    with fitz.open(stream=cleaned, filetype='pdf') as out:
+        for page in out:
+            assert b'Do' not in page.read_contents()
+            assert b'0 0 m 100 100 l S' in page.read_contents()
@@ -0,0 +1,64 @@
+from src.core.content_stream import remove_xobject_calls
+
+
+def test_nothing_to_remove_returns_the_same_object():
+    data = b"q 1 0 0 1 0 0 cm /Im0 Do Q"
+    new_data, report = remove_xobject_calls(data, {b'Other'})
+    assert new_data is data
+    assert report == {'removed': {}, 'blocks_removed': 0}
+
+
+def test_drawing_only_block_is_removed_whole():
+    data = b"BT (Body) Tj ET q 0.5 g 1 0 0 1 10 10 cm /Wm Do Q 0 0 m 5 5 l S"
+    new_data, report = remove_xobject_calls(data, {b'Wm'})
+    assert report == {'removed': {b'Wm': 1}, 'blocks_removed': 1}
+    assert b'cm' not in new_data and b'q' not in new_data.split()
+    assert b'BT (Body) Tj ET' in new_data and b'0 0 m 5 5 l S' in new_data
+
+
+def test_nested_blocks_keep_other_content():
+    # The inner block only draws the watermark; the outer one also draws a path
+    data = b"q 1 0 0 1 5 5 cm q /Wm Do Q 0 0 m 1 1 l S Q q q /Wm Do Q Q"
+    new_data, report = remove_xobject_calls(data, {b'Wm'})
+    assert report['removed'] == {b'Wm': 2}
+    # Inner block of the first group plus the whole second group (inner and outer)
+    assert report['blocks_removed'] == 3
+    tokens = new_data.split()
+    assert tokens.count(b'q') == tokens.count(b'Q') == 1
+    assert b'0 0 m 1 1 l S' in new_data and b'Do' not in new_data
+
+
+def test_do_inside_literal_strings_is_text():
+    data = b"BT (/Wm Do \\) (nested /Wm Do) Q) Tj ET /Wm Do"
+    new_data, report = remove_xobject_calls(data, {b'Wm'})
+    assert report['removed'] == {b'Wm': 1}
+    assert new_data.startswith(b"BT (/Wm Do \\) (nested /Wm Do) Q) Tj ET")
+
+
+def test_do_inside_inline_image_data_is_skipped():
+    data = b"q BI /W 4 /H 1 /BPC 8 /CS /G ID \x00/Wm Do\xff EI Q /Wm Do"
+    new_data, report = remove_xobject_calls(data, {b'Wm'})
+    assert report == {'removed': {b'Wm': 1}, 'blocks_removed': 0}
+    # The inline image block draws something, so it stays intact
+    assert new_data.startswith(b"q BI /W 4 /H 1 /BPC 8 /CS /G ID \x00/Wm Do\xff EI Q")
+
+
+def test_escaped_names_match_their_decoded_form():
+    data = b"/Fm#200 Do /Fm0 Do"
+    new_data, report = remove_xobject_calls(data, {b'Fm 0'})
+    assert report['removed'] == {b'Fm 0': 1}
+    assert new_data.split() == [b'/Fm0', b'Do']
+
+
+def test_do_with_extra_operands_is_left_alone():
+    data = b"/Wm 1 Do"
+    new_data, report = remove_xobject_calls(data, {b'Wm'})
+    assert new_data is data
+    assert report['removed'] == {}
+
+
+def test_comments_are_ignored():
+    data = b"% /Wm Do\nq /Wm Do Q"
+    new_data, report = remove_xobject_calls(data, {b'Wm'})
+    assert report == {'removed': {b'Wm': 1}, 'blocks_removed': 1}
+    assert new_data.strip() == b"% /Wm Do"
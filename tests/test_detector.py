@@ -0,0 +1,82 @@
+import fitz
+
+from src.core.cleaner import PDFCleaner
+from src.core.detector import TextPatternDetector, WatermarkDetector, _normalize_text
+
+
+def scan(doc):
+    return WatermarkDetector(detectors=[TextPatternDetector()]).scan_document(doc)
+
+
+def test_short_blocks_keep_their_digits():
+    assert _normalize_text("Page 12", fold_digits=True) != _normalize_text("Page 13", fold_digits=True)
+    assert _normalize_text("hello 0", fold_digits=True) != _normalize_text("hello 1", fold_digits=True)
+
+
+def test_long_blocks_fold_digits():
+    assert _normalize_text("Downloaded from example.com on 2024-05-01", fold_digits=True) == \
+        _normalize_text("Downloaded  from Example.com on 2024-05-02", fold_digits=True)
+
+
+def test_digits_kept_unless_folding():
+    assert _normalize_text("Downloaded from example.com on 2024-05-01") != \
+        _normalize_text("Downloaded from example.com on 2024-05-02")
+
+
+def test_body_lines_differing_by_a_number_are_clean(make_pdf):
+    doc = make_pdf([[(72, 300, f"hello {n}")] for n in range(3)])
+    result = scan(doc)
+    assert result['text_patterns'] == []
+    assert result['verdict'] == 'clean'
+
+
+def test_body_template_differing_by_a_number_is_clean(make_pdf):
+    doc = make_pdf([[(72, 300, f"Body text of page {n + 1} with some words")] for n in range(5)])
+    assert scan(doc)['verdict'] == 'clean'
+
+
+def test_page_number_footers_are_clean(make_pdf):
+    topics = ["apples", "rivers", "engines", "poetry", "storms", "glaciers", "markets", "orbits"]
+    doc = make_pdf([[(72, 100, f"A few words about {topic}"), (280, 800, f"Page {n + 1}")]
+                    for n, topic in enumerate(topics)])
+    assert scan(doc)['verdict'] == 'clean'
+
+
+def test_stamp_with_varying_date_is_marked(make_pdf):
+    doc = make_pdf([[(72, 100, f"Body {n}"), (72, 820, f"Downloaded from example.com on 2024-05-{n + 1:02d}")]
+                    for n in range(6)])
+    result = scan(doc)
+    assert result['verdict'] == 'marked'
+    assert [p['count'] for p in result['text_patterns']] == [6]
+
+
+def test_repeat_elsewhere_on_the_page_is_not_a_pattern(make_pdf):
+    # Same text, but wandering down the page: not a fixed-position stamp
+    doc = make_pdf([[(72, 100 + 120 * n, "Confidential draft for review")] for n in range(6)])
+    assert scan(doc)['text_patterns'] == []
+
+
+def test_producer_signature_is_informational(make_pdf):
+    doc = make_pdf([[(72, 300, "Plain text")]])
+    doc.set_metadata({'producer': 'UPDF 1.8'})
+    result = WatermarkDetector().scan_document(doc)
+    assert result['producer'] == 'UPDF'
+    assert result['verdict'] == 'clean'
+
+
+def test_cleaned_logo_does_not_rescan_as_marked(make_pdf):
+    doc = make_pdf([[(72, 400, f"Different text {word}")] for word in ("one", "two", "three")])
+    logo = fitz.Pixmap(fitz.csRGB, fitz.IRect(0, 0, 40, 20), False)
+    logo.clear_with(90)
+    xref = 0
+    for page in doc:
+        xref = page.insert_image(fitz.Rect(10, 10, 90, 50), pixmap=logo, xref=xref)
+    doc = fitz.open(stream=doc.tobytes(), filetype='pdf')
+    assert WatermarkDetector().scan_document(doc)['images'] == 1
+
+    cleaned, result = PDFCleaner().clean_bytes(doc.tobytes(), {'remove_watermarks': True})
+    assert result['watermarks_removed'] == 1
+    with fitz.open(stream=cleaned, filetype='pdf') as out:
+        rescan = WatermarkDetector().scan_document(out)
+    assert rescan['images'] == 0
+    assert rescan['verdict'] == 'clean'
@@ -0,0 +1,61 @@
+import fitz
+
+from src.core.cleaner import PDFCleaner
+from src.core.content_stream import decode_name, remove_xobject_calls
+from src.core.resource_inventory import ResourceInventory
+
+ESCAPED = 'W#80mark#20x'
+DECODED = b'W\x80mark x'
+
+
+def make_escaped_doc(pages=2):
+    """Every page draws one shared form XObject whose name uses #xx escapes"""
+    doc = fitz.open()
+    form = None
+    for _ in range(pages):
+        page = doc.new_page()
+        if form is None:
+            form = doc.get_new_xref()
+            doc.update_object(form, "<< /Type /XObject /Subtype /Form /BBox [0 0 50 50] >>")
+            doc.update_stream(form, b"0 0 50 50 re f")
+        doc.xref_set_key(page.xref, "Resources", f"<< /XObject << /{ESCAPED} {form} 0 R >> >>")
+        contents = doc.get_new_xref()
+        doc.update_object(contents, "<< >>")
+        doc.update_stream(contents, f"q 1 0 0 1 10 10 cm /{ESCAPED} Do Q 0 0 m 100 100 l S".encode())
+        doc.xref_set_key(page.xref, "Contents", f"{contents} 0 R")
+    return fitz.open(stream=doc.tobytes(), filetype='pdf')
+
+
+def test_decode_name_bytes_and_str_agree():
+    assert decode_name(b'Fm#200') == b'Fm 0'
+    assert decode_name('Fm#200') == b'Fm 0'
+    assert decode_name(ESCAPED) == DECODED
+    assert decode_name(b'Plain') == b'Plain'
+
+
+def test_inventory_names_match_content_stream_names():
+    doc = make_escaped_doc()
+    names = {name for name, _, _ in ResourceInventory(doc).calls(0)}
+    assert names == {DECODED}
+
+    content = doc.xref_stream(doc[0].get_contents()[0])
+    new_data, report = remove_xobject_calls(content, names)
+    assert report['removed'] == {DECODED: 1}
+    assert b'Do' not in new_data
+    assert b'0 0 m 100 100 l S' in new_data
+
+
+def test_str_names_are_one_byte_per_character():
+    # A decoded str name ('\x80') must not turn into UTF-8 (b'\xc2\x80')
+    _, report = remove_xobject_calls(f"/{ESCAPED} Do".encode(), {DECODED.decode('latin-1')})
+    assert sum(report['removed'].values()) == 1
+
+
+def test_cleaner_removes_escaped_watermark_calls():
+    doc = make_escaped_doc(pages=3)
+    cleaned, result = PDFCleaner().clean_bytes(doc.tobytes(), {'remove_watermarks': True})
+    assert result['success'], result.get('error')
+    assert result['watermarks_removed'] == 3
+    with fitz.open(stream=cleaned, filetype='pdf') as out:
+        for page in out:
+            assert b' Do' not in page.read_contents()
@@ -0,0 +1,79 @@
+import fitz
+
+from src.core.resource_inventory import ResourceInventory
+
+
+def new_object(doc, source, stream=None):
+    xref = doc.get_new_xref()
+    doc.update_object(xref, source)
+    if stream is not None:
+        doc.update_stream(xref, stream)
+    return xref
+
+
+def make_doc():
+    """
+    Three pages sharing a logo image; pages 0 and 1 reach it through a form
+    that nests a second form, page 2 draws it directly. Page 1 inherits its
+    resources from the page tree, page 2 uses an indirect /Resources object.
+    """
+    doc = fitz.open()
+    for _ in range(3):
+        doc.new_page()
+    image = new_object(doc, "<< /Type /XObject /Subtype /Image /Width 2 /Height 2 "
+                            "/ColorSpace /DeviceGray /BitsPerComponent 8 >>", b"\x00\xff\xff\x00")
+    inner = new_object(doc, f"<< /Type /XObject /Subtype /Form /BBox [0 0 2 2] "
+                            f"/Resources << /XObject << /Logo {image} 0 R >> >> >>", b"/Logo Do")
+    outer = new_object(doc, f"<< /Type /XObject /Subtype /Form /BBox [0 0 2 2] "
+                            f"/Resources << /XObject << /Inner {inner} 0 R >> >> >>", b"/Inner Do")
+
+    doc.xref_set_key(doc[0].xref, "Resources", f"<< /XObject << /Wm {outer} 0 R >> >>")
+    doc.xref_set_key(doc[1].xref, "Resources", "null")
+    tree = int(doc.xref_get_key(doc[1].xref, "Parent")[1].split()[0])
+    doc.xref_set_key(tree, "Resources", f"<< /XObject << /Wm {outer} 0 R >> >>")
+    resources = new_object(doc, f"<< /XObject << /Logo {image} 0 R >> >>")
+    doc.xref_set_key(doc[2].xref, "Resources", f"{resources} 0 R")
+    doc = fitz.open(stream=doc.tobytes(), filetype='pdf')
+    return doc, image, inner, outer
+
+
+def test_nested_and_inherited_resources_are_counted_per_page():
+    doc, image, inner, outer = make_doc()
+    inventory = ResourceInventory(doc)
+    assert inventory.page_xrefs(0) == {outer, inner, image}
+    assert inventory.page_xrefs(1) == {outer, inner, image}
+    assert inventory.page_xrefs(2) == {image}
+    assert inventory.page_counts[image] == 3
+    assert inventory.page_counts[outer] == inventory.page_counts[inner] == 2
+
+
+def test_repeated_filters_by_kind_and_page_count():
+    doc, image, inner, outer = make_doc()
+    inventory = ResourceInventory(doc)
+    assert list(inventory.repeated(ResourceInventory.IMAGE, 3)) == [image]
+    assert set(inventory.repeated(ResourceInventory.FORM, 2)) == {inner, outer}
+    assert list(inventory.repeated(ResourceInventory.FORM, 3)) == []
+
+
+def test_counts_only_cover_the_requested_pages():
+    doc, image, inner, outer = make_doc()
+    inventory = ResourceInventory(doc, [2])
+    assert inventory.page_counts[image] == 1
+    assert inventory.page_counts[outer] == 0
+
+
+def test_calls_name_the_invoker():
+    doc, image, inner, outer = make_doc()
+    calls = set(ResourceInventory(doc).calls(0))
+    assert calls == {(b'Wm', outer, 0), (b'Inner', inner, outer), (b'Logo', image, inner)}
+    assert set(ResourceInventory(doc).calls(2)) == {(b'Logo', image, 0)}
+
+
+def test_self_referencing_form_terminates():
+    doc = fitz.open()
+    page = doc.new_page()
+    form = new_object(doc, "<< /Type /XObject /Subtype /Form /BBox [0 0 1 1] >>", b"/Me Do")
+    doc.xref_set_key(form, "Resources", f"<< /XObject << /Me {form} 0 R >> >>")
+    doc.xref_set_key(page.xref, "Resources", f"<< /XObject << /F {form} 0 R >> >>")
+    doc = fitz.open(stream=doc.tobytes(), filetype='pdf')
+    assert ResourceInventory(doc).page_xrefs(0) == {form}
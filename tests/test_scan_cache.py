@@ -0,0 +1,61 @@
+import os
+
+from src.core.scan_cache import ScanCache
+
+
+def write(path, data, mtime_ns=1_700_000_000_000_000_000):
+    with open(path, 'wb') as f:
+        f.write(data)
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+    return str(path)
+
+
+def test_hit_until_file_changes(tmp_path):
+    cache = ScanCache(tmp_path / 'cache.db')
+    pdf = write(tmp_path / 'a.pdf', b'%PDF-1.7 one')
+    result, fingerprint = cache.lookup(pdf)
+    assert result is None
+    cache.store(pdf, fingerprint, {'verdict': 'clean'})
+    assert cache.lookup(pdf)[0] == {'verdict': 'clean'}
+
+    write(pdf, b'%PDF-1.7 two!', mtime_ns=1_800_000_000_000_000_000)
+    assert cache.lookup(pdf)[0] is None
+
+
+def test_content_hash_catches_same_size_and_mtime_rewrite(tmp_path):
+    pdf = write(tmp_path / 'a.pdf', b'%PDF-1.7 one')
+    for use_hash, expected in ((False, {'verdict': 'clean'}), (True, None)):
+        cache = ScanCache(tmp_path / f'cache{use_hash}.db', use_content_hash=use_hash)
+        write(pdf, b'%PDF-1.7 one')
+        cache.store(pdf, cache.lookup(pdf)[1], {'verdict': 'clean'})
+        write(pdf, b'%PDF-1.7 two') # same size, same mtime
+        assert cache.lookup(pdf)[0] == expected
+
+
+def test_eviction_is_by_size_and_keeps_recent_entries(tmp_path):
+    cache = ScanCache(tmp_path / 'cache.db', max_bytes=20_000)
+    paths = [write(tmp_path / f'{n}.pdf', b'%PDF') for n in range(60)]
+    for path in paths:
+        cache.store(path, cache.fingerprint(path), {'text_patterns': ['x' * 1000]})
+    cache._trim()
+    assert cache.total_bytes() <= 20_000
+    assert cache.lookup(paths[-1])[0] is not None
+    assert cache.lookup(paths[0])[0] is None
+
+
+def test_detector_version_change_drops_results(tmp_path):
+    pdf = write(tmp_path / 'a.pdf', b'%PDF')
+    cache = ScanCache(tmp_path / 'cache.db', detector_version=1)
+    cache.store(pdf, cache.fingerprint(pdf), {'verdict': 'clean'})
+    cache.close()
+    assert ScanCache(tmp_path / 'cache.db', detector_version=2).lookup(pdf)[0] is None
+
+
+def test_calls_after_close_are_ignored(tmp_path):
+    pdf = write(tmp_path / 'a.pdf', b'%PDF')
+    cache = ScanCache(tmp_path / 'cache.db')
+    fingerprint = cache.fingerprint(pdf)
+    cache.close()
+    cache.store(pdf, fingerprint, {'verdict': 'clean'}) # e.g. a scan finishing after shutdown
+    assert cache.lookup(pdf)[0] is None
+    cache.close()